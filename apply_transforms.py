@@ -1,18 +1,17 @@
 import bpy
-from bpy.types import Armature
-from typing import cast
+
+import numpy as np
+
+assert bpy.context is not None
 
 
 class TransformApplier:
     armature: bpy.types.Object
 
     def __init__(self) -> None:
-        assert bpy.context
-
-        ob: bpy.types.Object | None = None
-        for ob in bpy.data.objects:
-            if ob.type == "ARMATURE":
-                break
+        ob: bpy.types.Object | None = next(
+            (ob for ob in bpy.data.objects if ob.type == "ARMATURE"), None
+        )
 
         assert ob
         self.armature = ob
@@ -21,52 +20,72 @@ class TransformApplier:
         matrix_world = self.armature.matrix_world
 
         _, _, scale = matrix_world.decompose()
-        scale_2d = scale.to_2d()
+        scale_per_axis = tuple(scale)
 
         self.select_and_make_active(self.armature)
         bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
 
         if all_actions:
-            for action in bpy.data.actions:
-                for fcurve in action.fcurves:
-                    if not fcurve.data_path.startswith("pose.bones["):
-                        continue
-
-                    print(fcurve.data_path)
-
-                    if "location" in fcurve.data_path:
-                        for keyframe in fcurve.keyframe_points:
-                            print(f"{keyframe.co=} {scale=}")
-                            keyframe.co = scale_2d * keyframe.co
+            actions = bpy.data.actions
         else:
-            action = (
-                self.armature.animation_data.action
-                if self.armature.animation_data
-                else None
-            )
+            animation_data = self.armature.animation_data
+            action = animation_data.action if animation_data else None
             if not action:
                 print("no actions found, finishing")
                 return
 
-            for fcurve in action.fcurves:
-                if not fcurve.data_path.startswith("pose.bones["):
-                    continue
+            actions = [action]
+
+        location_fcurves = [
+            fcurve
+            for action in actions
+            for fcurve in self.bone_location_fcurves(action)
+        ]
 
-                print(fcurve.data_path)
+        # Size a single buffer for the longest curve and reuse it for all of them.
+        key_count = max((len(fc.keyframe_points) for fc in location_fcurves), default=0)
+        buf = np.empty(key_count * 2, dtype=np.single)
 
-                if "location" in fcurve.data_path:
-                    for keyframe in fcurve.keyframe_points:
-                        print(f"{keyframe.co=} {scale=}")
-                        keyframe.co = scale_2d * keyframe.co
+        for fcurve in location_fcurves:
+            self.scale_keyframes(fcurve, scale_per_axis[fcurve.array_index], buf)
+
+        # Recalculate handles only once every curve has been written.
+        for fcurve in location_fcurves:
+            fcurve.update()
+
+    def bone_location_fcurves(self, action: bpy.types.Action) -> list[bpy.types.FCurve]:
+        # Match the exact location paths of this armature's bones in a single
+        # pass over the fcurves, since actions often also animate object, shape
+        # key or material data.
+        data_paths = {
+            pose_bone.path_from_id("location") for pose_bone in self.armature.pose.bones
+        }
+
+        return [fcurve for fcurve in action.fcurves if fcurve.data_path in data_paths]
+
+    @staticmethod
+    def scale_keyframes(
+        fcurve: bpy.types.FCurve, factor: float, buf: np.ndarray
+    ) -> None:
+        # Transfer all keyframe coordinates in one call instead of
+        # crossing into RNA once per keyframe. The handles are scaled
+        # together with the keys so Bezier tangents keep their shape.
+        # Only the value column is scaled, frame numbers are left as is.
+        keyframe_points = fcurve.keyframe_points
+        co = buf[: len(keyframe_points) * 2]
+        values = co[1::2]
+
+        for attribute in ("co", "handle_left", "handle_right"):
+            keyframe_points.foreach_get(attribute, co)
+            values *= factor
+            keyframe_points.foreach_set(attribute, co)
 
     @staticmethod
     def select_and_make_active(ob: bpy.types.Object):
-        for ob_to_deselect in bpy.data.objects:
-            if ob_to_deselect == ob:
-                continue
-            ob_to_deselect.select_set(False)
+        # Object selection is not exposed as a foreach-compatible property,
+        # so let the operator clear it in a single call.
+        bpy.ops.object.select_all(action="DESELECT")
 
-        assert bpy.context
         bpy.context.view_layer.objects.active = ob
         ob.select_set(True)
 
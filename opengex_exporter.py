@@ -36,12 +36,14 @@ from bpy_extras.io_utils import ExportHelper
 
 from mathutils import Matrix
 
+import numpy as np
+
 import struct
 import math
+import re
 import os
+import contextlib
 import time
-from io import BytesIO
-from shutil import copyfileobj
 from enum import Enum
 
 
@@ -55,8 +57,25 @@ ANIMATION_SAMPLED = 0
 ANIMATION_LINEAR = 1
 ANIMATION_BEZIER = 2
 
+# Keyframe.interpolation values as returned by foreach_get.
+interpolationItems = bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items
+INTERPOLATION_LINEAR = interpolationItems["LINEAR"].value
+INTERPOLATION_BEZIER = interpolationItems["BEZIER"].value
+
 EPSILON = 1.0e-6
 
+packFloat = struct.Struct("<f").pack
+unpackUInt = struct.Struct("<I").unpack
+
+hexDigits = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
+hexShifts = np.arange(28, -1, -4, dtype=np.uint32)
+
+# Data path of a shape key value, naming the key block either by quoted name or by
+# index. Group 1 is present when the path starts at the object rather than the key.
+keyBlockPath = re.compile(
+    r"(data\.shape_keys\.)?key_blocks\[(?:[\"'](.*)[\"']|(\d+))\]\.value"
+)
+
 structIdentifier = [
     b"Node $",
     b"BoneNode $",
@@ -74,6 +93,12 @@ deltaSubrotationName = [b"dxrot", b"dyrot", b"dzrot"]
 deltaSubscaleName = [b"dxscl", b"dyscl", b"dzscl"]
 axisName = [b"x", b"y", b"z"]
 
+# Axis indices of each Euler rotation mode, in the order the rotations are written.
+eulerAxisOrder = {
+    mode: tuple(ord(mode[2 - i]) - 0x58 for i in range(3))
+    for mode in ("XYZ", "XZY", "YXZ", "YZX", "ZXY", "ZYX")
+}
+
 
 VERSION = bpy.app.version
 
@@ -85,9 +110,11 @@ class MaterialPropertyFlags(Enum):
     PropertyTexture = 4
 
 
-class ExportVertex:
+class ExportMesh:
+    # Structure of arrays describing export vertices. Row i of every array
+    # belongs to the same vertex, one per triangle corner after deindexing.
+
     __slots__ = (
-        "hash",
         "vertexIndex",
         "faceIndex",
         "position",
@@ -97,55 +124,34 @@ class ExportVertex:
         "texcoord1",
     )
 
+    def __init__(
+        self, vertexIndex, faceIndex, position, normal, color, texcoord0, texcoord1
+    ):
+        self.vertexIndex = vertexIndex
+        self.faceIndex = faceIndex
+        self.position = position
+        self.normal = normal
+        self.color = color
+        self.texcoord0 = texcoord0
+        self.texcoord1 = texcoord1
+
+    def __len__(self):
+        return len(self.vertexIndex)
+
+    def take(self, indices):
+        return ExportMesh(*(getattr(self, name)[indices] for name in self.__slots__))
+
+
+class TransformChannels:
+    # Keyframed x, y, and z channels of one transform property, such as location
+    # or delta_scale. Entry i of every field belongs to the same array index.
+
+    __slots__ = ("curves", "kinds", "animated")
+
     def __init__(self):
-        self.color = [1.0, 1.0, 1.0]
-        self.texcoord0 = [0.0, 0.0]
-        self.texcoord1 = [0.0, 0.0]
-
-    def __eq__(self, v):
-        if self.hash != v.hash:
-            return False
-        if self.position != v.position:
-            return False
-        if self.normal != v.normal:
-            return False
-        if self.color != v.color:
-            return False
-        if self.texcoord0 != v.texcoord0:
-            return False
-        if self.texcoord1 != v.texcoord1:
-            return False
-        return True
-
-    def Hash(self):
-        h = hash(self.position[0])
-        h = h * 21737 + hash(self.position[1])
-        h = h * 21737 + hash(self.position[2])
-        h = h * 21737 + hash(self.normal[0])
-        h = h * 21737 + hash(self.normal[1])
-        h = h * 21737 + hash(self.normal[2])
-        h = h * 21737 + hash(self.color[0])
-        h = h * 21737 + hash(self.color[1])
-        h = h * 21737 + hash(self.color[2])
-        h = h * 21737 + hash(self.texcoord0[0])
-        h = h * 21737 + hash(self.texcoord0[1])
-        h = h * 21737 + hash(self.texcoord1[0])
-        h = h * 21737 + hash(self.texcoord1[1])
-        self.hash = h
-
-
-class WriteBuffer:
-    def __init__(self) -> None:
-        self.buffer = BytesIO()
-
-    def write(self, data: bytes):
-        self.buffer.write(data)
-
-    def write_to_file(self, filepath: str):
-        self.buffer.seek(0)
-
-        with open(filepath, "wb") as f:
-            copyfileobj(self.buffer, f)
+        self.curves = [None, None, None]
+        self.kinds = [0, 0, 0]
+        self.animated = np.zeros(3, dtype=bool)
 
 
 class OpenGexPreferences(bpy.types.AddonPreferences):
@@ -169,37 +175,62 @@ class MatrixApplicator:
         matrix_world = self.armature.matrix_world
 
         _, _, scale = matrix_world.decompose()
-        scale_2d = scale.to_2d()
+        scale_per_axis = tuple(scale)
 
         self.select_and_make_active(self.armature)
         bpy.ops.object.transform_apply(location=True, rotation=True, scale=True)
 
-        action = (
-            self.armature.animation_data.action
-            if self.armature.animation_data
-            else None
-        )
+        animation_data = self.armature.animation_data
+        action = animation_data.action if animation_data else None
         if not action:
             print("no actions found, finishing")
             return
 
-        for fcurve in action.fcurves:
-            if not fcurve.data_path.startswith("pose.bones["):
-                continue
+        location_fcurves = self.bone_location_fcurves(action)
+
+        # Size a single buffer for the longest curve and reuse it for all of them.
+        key_count = max((len(fc.keyframe_points) for fc in location_fcurves), default=0)
+        buf = np.empty(key_count * 2, dtype=np.single)
 
-            print(fcurve.data_path)
+        for fcurve in location_fcurves:
+            self.scale_keyframes(fcurve, scale_per_axis[fcurve.array_index], buf)
 
-            if "location" in fcurve.data_path:
-                for keyframe in fcurve.keyframe_points:
-                    print(f"{keyframe.co=} {scale=}")
-                    keyframe.co = scale_2d * keyframe.co
+        # Recalculate handles only once every curve has been written.
+        for fcurve in location_fcurves:
+            fcurve.update()
+
+    def bone_location_fcurves(self, action: bpy.types.Action) -> list[bpy.types.FCurve]:
+        # Match the exact location paths of this armature's bones in a single
+        # pass over the fcurves, since actions often also animate object, shape
+        # key or material data.
+        data_paths = {
+            pose_bone.path_from_id("location") for pose_bone in self.armature.pose.bones
+        }
+
+        return [fcurve for fcurve in action.fcurves if fcurve.data_path in data_paths]
+
+    @staticmethod
+    def scale_keyframes(
+        fcurve: bpy.types.FCurve, factor: float, buf: np.ndarray
+    ) -> None:
+        # Transfer all keyframe coordinates in one call instead of
+        # crossing into RNA once per keyframe. The handles are scaled
+        # together with the keys so Bezier tangents keep their shape.
+        # Only the value column is scaled, frame numbers are left as is.
+        keyframe_points = fcurve.keyframe_points
+        co = buf[: len(keyframe_points) * 2]
+        values = co[1::2]
+
+        for attribute in ("co", "handle_left", "handle_right"):
+            keyframe_points.foreach_get(attribute, co)
+            values *= factor
+            keyframe_points.foreach_set(attribute, co)
 
     @staticmethod
     def select_and_make_active(ob: bpy.types.Object):
-        for ob_to_deselect in bpy.data.objects:
-            if ob_to_deselect == ob:
-                continue
-            ob_to_deselect.select_set(False)
+        # Object selection is not exposed as a foreach-compatible property,
+        # so let the operator clear it in a single call.
+        bpy.ops.object.select_all(action="DESELECT")
 
         assert bpy.context
         bpy.context.view_layer.objects.active = ob
@@ -259,418 +290,176 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         default=False,
     )  # type: ignore
 
-    def write(self, text):
-        self.file.write(text)
+    def begin_output(self, file):
+        # Resolve the output method and the float formatter once per export
+        # rather than looking them up again for every value written.
+        self.file = file
+        self.write = file.write
+        self.indentCache = {}
+
+        if self.option_float_as_hex:
+            self.format_float = self.format_float_as_hex
+            self.format_floats = self.format_floats_as_hex
+        else:
+            self.format_float = self.format_float_as_is
+            self.format_floats = self.format_floats_as_is
+
+    def indent(self, extra=0):
+        level = self.indentLevel + extra
+        tabs = self.indentCache.get(level)
+        if tabs is None:
+            tabs = self.indentCache[level] = b"\t" * level
+        return tabs
 
     def indent_write(self, text, extra=0, newline=False):
         if newline:
-            self.file.write(b"\n")
-        for i in range(self.indentLevel + extra):
-            self.file.write(b"\t")
-        self.file.write(text)
+            self.write(b"\n" + self.indent(extra) + text)
+        else:
+            self.write(self.indent(extra) + text)
+
+    def close_structures(self, count):
+        # Closes the innermost count structures, one brace per line.
+        braces = []
+        for i in range(count):
+            self.indentLevel -= 1
+            braces.append(self.indent() + b"}\n")
+        self.write(b"".join(braces))
 
     def write_int(self, i):
-        self.file.write(bytes(str(i), "UTF-8"))
+        self.write(b"%d" % i)
 
-    def write_float_as_is(self, f):
+    @staticmethod
+    def format_float_as_is(f):
         if (math.isinf(f)) or (math.isnan(f)):
-            self.file.write(b"0.0")
-        else:
-            self.file.write(bytes(str("{:.6f}".format(f)), "UTF-8"))
+            return b"0.0"
 
-    def float_to_hex(self, f):
-        i = struct.unpack("<I", struct.pack("<f", f))[0]
-        return "0x{:08x}".format(i)
+        return b"%.6f" % f
 
-    def write_float_as_hex(self, f):
+    @staticmethod
+    def format_float_as_hex(f):
         if (math.isinf(f)) or (math.isnan(f)):
-            self.file.write("0x{:08x}".format(0.0))
-        else:
-            self.file.write(bytes(str(self.float_to_hex(f)), "UTF-8"))
+            return b"0x00000000"
 
-    WriteFloatMap = [write_float_as_is, write_float_as_hex]
+        return b"0x%08x" % unpackUInt(packFloat(f))[0]
 
     def write_float(self, f):
-        self.WriteFloatMap[int(self.option_float_as_hex)](self, f)
+        self.write(self.format_float(f))
+
+    @staticmethod
+    def format_floats_as_is(values):
+        if isinstance(values, np.ndarray):
+            values = values.tolist()
+
+        return [b"%.6f" % f if math.isfinite(f) else b"0.0" for f in values]
+
+    @staticmethod
+    def format_floats_as_hex(values):
+        # Reinterpret the whole batch as 32-bit integers at once instead of
+        # packing and unpacking every float. Non-finite values become zero.
+        floats = np.array(values, dtype=np.single)
+        floats[~np.isfinite(floats)] = 0.0
+
+        # Spell out the eight hex digits of every value with NumPy, so the
+        # tokens come back as fixed-width bytes without formatting each one.
+        text = np.empty((len(floats), 10), dtype=np.uint8)
+        text[:, :2] = np.frombuffer(b"0x", dtype=np.uint8)
+        text[:, 2:] = hexDigits[(floats.view(np.uint32)[:, None] >> hexShifts) & 0xF]
+        return text.view("S10").ravel().tolist()
+
+    def format_matrix(self, matrix):
+        # OpenGEX matrices are stored in column-major order.
+        return self.format_floats([matrix[j][i] for i in range(4) for j in range(4)])
 
     def write_matrix(self, matrix):
-        self.indent_write(b"{", 1)
-        self.write_float(matrix[0][0])
-        self.write(b", ")
-        self.write_float(matrix[1][0])
-        self.write(b", ")
-        self.write_float(matrix[2][0])
-        self.write(b", ")
-        self.write_float(matrix[3][0])
-        self.write(b",\n")
-
-        self.indent_write(b" ", 1)
-        self.write_float(matrix[0][1])
-        self.write(b", ")
-        self.write_float(matrix[1][1])
-        self.write(b", ")
-        self.write_float(matrix[2][1])
-        self.write(b", ")
-        self.write_float(matrix[3][1])
-        self.write(b",\n")
-
-        self.indent_write(b" ", 1)
-        self.write_float(matrix[0][2])
-        self.write(b", ")
-        self.write_float(matrix[1][2])
-        self.write(b", ")
-        self.write_float(matrix[2][2])
-        self.write(b", ")
-        self.write_float(matrix[3][2])
-        self.write(b",\n")
-
-        self.indent_write(b" ", 1)
-        self.write_float(matrix[0][3])
-        self.write(b", ")
-        self.write_float(matrix[1][3])
-        self.write(b", ")
-        self.write_float(matrix[2][3])
-        self.write(b", ")
-        self.write_float(matrix[3][3])
-        self.write(b"}\n")
+        floats = self.format_matrix(matrix)
+        columns = [b", ".join(floats[i : i + 4]) for i in range(0, 16, 4)]
+        indent = self.indent(1)
+        self.write(indent + b"{" + (b",\n" + indent + b" ").join(columns) + b"}\n")
 
     def write_matrix_flat(self, matrix):
-        self.indent_write(b"{", 1)
-        self.write_float(matrix[0][0])
-        self.write(b", ")
-        self.write_float(matrix[1][0])
-        self.write(b", ")
-        self.write_float(matrix[2][0])
-        self.write(b", ")
-        self.write_float(matrix[3][0])
-        self.write(b", ")
-        self.write_float(matrix[0][1])
-        self.write(b", ")
-        self.write_float(matrix[1][1])
-        self.write(b", ")
-        self.write_float(matrix[2][1])
-        self.write(b", ")
-        self.write_float(matrix[3][1])
-        self.write(b", ")
-        self.write_float(matrix[0][2])
-        self.write(b", ")
-        self.write_float(matrix[1][2])
-        self.write(b", ")
-        self.write_float(matrix[2][2])
-        self.write(b", ")
-        self.write_float(matrix[3][2])
-        self.write(b", ")
-        self.write_float(matrix[0][3])
-        self.write(b", ")
-        self.write_float(matrix[1][3])
-        self.write(b", ")
-        self.write_float(matrix[2][3])
-        self.write(b", ")
-        self.write_float(matrix[3][3])
-        self.write(b"}")
-
-    def write_color(self, color):
-        self.write(b"{")
-        self.write_float(color[0])
-        self.write(b", ")
-        self.write_float(color[1])
-        self.write(b", ")
-        self.write_float(color[2])
-        self.write(b"}")
-
-    def write_file_name(self, filename):
-        length = len(filename)
-        if length != 0:
-            if (length > 2) and (filename[1] == ":"):
-                self.write(b"//")
-                self.write(bytes(filename[0], "UTF-8"))
-                self.write(bytes(filename[2:length].replace("\\", "/"), "UTF-8"))
-            else:
-                self.write(bytes(filename.replace("\\", "/"), "UTF-8"))
-
-    def write_int_array(self, valueArray):
-        count = len(valueArray)
-        k = 0
-
-        lineCount = count >> 6
-        for i in range(lineCount):
-            self.indent_write(b"", 1)
-            for j in range(63):
-                self.write_int(valueArray[k])
-                self.write(b", ")
-                k += 1
+        floats = self.format_matrix(matrix)
+        indent = self.indent(1)
+        self.write(indent + b"{" + b", ".join(floats) + b"}")
 
-            self.write_int(valueArray[k])
-            k += 1
+    def write_matrix_array(self, matrices):
+        # Writes a stack of matrices one per line, each flattened in
+        # column-major order, formatting all of their components in one batch.
+        it = iter(self.format_floats(matrices.transpose(0, 2, 1).ravel()))
+        rows = [b"{%s}" % b", ".join(row) for row in zip(*[it] * 16)]
+        self.write_token_lines(rows, 1)
 
-            if i * 64 < count - 64:
-                self.write(b",\n")
-            else:
-                self.write(b"\n")
+    @staticmethod
+    def format_file_name(filename):
+        # Drive letters become a leading "//" and backslashes become slashes.
+        filename = filename.replace("\\", "/")
+        if (len(filename) > 2) and (filename[1] == ":"):
+            filename = "//" + filename[0] + filename[2:]
 
-        count &= 63
-        if count != 0:
-            self.indent_write(b"", 1)
-            for j in range(count - 1):
-                self.write_int(valueArray[k])
-                self.write(b", ")
-                k += 1
+        return filename.encode("UTF-8")
 
-            self.write_int(valueArray[k])
-            self.write(b"\n")
+    def write_int_array(self, valueArray):
+        self.write_token_lines([b"%d" % i for i in valueArray], 64)
 
-    def write_float_array(self, valueArray):
-        count = len(valueArray)
-        k = 0
-
-        lineCount = count >> 4
-        for i in range(lineCount):
-            self.indent_write(b"", 1)
-            for j in range(15):
-                self.write_float(valueArray[k])
-                self.write(b", ")
-                k += 1
+    def write_token_lines(self, tokens, tokensPerLine):
+        # Writes the tokens comma-separated, tokensPerLine to a line, with each
+        # line indented one level deeper than the current structure.
+        indent = self.indent(1)
+        lines = [
+            indent + b", ".join(tokens[i : i + tokensPerLine])
+            for i in range(0, len(tokens), tokensPerLine)
+        ]
 
-            self.write_float(valueArray[k])
-            k += 1
+        if lines:
+            self.write(b",\n".join(lines) + b"\n")
 
-            if i * 16 < count - 16:
-                self.write(b",\n")
-            else:
-                self.write(b"\n")
+    def write_float_array(self, valueArray):
+        self.write_token_lines(self.format_floats(valueArray), 16)
 
-        count &= 15
-        if count != 0:
-            self.indent_write(b"", 1)
-            for j in range(count - 1):
-                self.write_float(valueArray[k])
-                self.write(b", ")
-                k += 1
+    def format_vector(self, vector):
+        return b"{%s}" % b", ".join(map(self.format_float, vector))
 
-            self.write_float(valueArray[k])
-            self.write(b"\n")
+    def format_quaternion(self, quaternion):
+        # OpenGEX stores the scalar part last.
+        return self.format_vector(
+            (quaternion[1], quaternion[2], quaternion[3], quaternion[0])
+        )
 
     def write_vector_2d(self, vector):
-        self.write(b"{")
-        self.write_float(vector[0])
-        self.write(b", ")
-        self.write_float(vector[1])
-        self.write(b"}")
+        f = self.format_float
+        self.write(b"{%s, %s}" % (f(vector[0]), f(vector[1])))
 
     def write_vector_3d(self, vector):
-        self.write(b"{")
-        self.write_float(vector[0])
-        self.write(b", ")
-        self.write_float(vector[1])
-        self.write(b", ")
-        self.write_float(vector[2])
-        self.write(b"}")
+        f = self.format_float
+        self.write(b"{%s, %s, %s}" % (f(vector[0]), f(vector[1]), f(vector[2])))
 
     def write_vector_4d(self, vector):
-        self.write(b"{")
-        self.write_float(vector[0])
-        self.write(b", ")
-        self.write_float(vector[1])
-        self.write(b", ")
-        self.write_float(vector[2])
-        self.write(b", ")
-        self.write_float(vector[3])
-        self.write(b"}")
+        f = self.format_float
+        self.write(
+            b"{%s, %s, %s, %s}"
+            % (f(vector[0]), f(vector[1]), f(vector[2]), f(vector[3]))
+        )
 
     def write_quaternion(self, quaternion):
-        self.write(b"{")
-        self.write_float(quaternion[1])
-        self.write(b", ")
-        self.write_float(quaternion[2])
-        self.write(b", ")
-        self.write_float(quaternion[3])
-        self.write(b", ")
-        self.write_float(quaternion[0])
-        self.write(b"}")
-
-    def write_vertex_array_2d(self, vertexArray, attrib):
-        count = len(vertexArray)
-        k = 0
-
-        lineCount = count >> 3
-        for i in range(lineCount):
-            self.indent_write(b"", 1)
-            for j in range(7):
-                self.write_vector_2d(getattr(vertexArray[k], attrib))
-                self.write(b", ")
-                k += 1
-
-            self.write_vector_2d(getattr(vertexArray[k], attrib))
-            k += 1
-
-            if i * 8 < count - 8:
-                self.write(b",\n")
-            else:
-                self.write(b"\n")
-
-        count &= 7
-        if count != 0:
-            self.indent_write(b"", 1)
-            for j in range(count - 1):
-                self.write_vector_2d(getattr(vertexArray[k], attrib))
-                self.write(b", ")
-                k += 1
-
-            self.write_vector_2d(getattr(vertexArray[k], attrib))
-            self.write(b"\n")
-
-    def write_vertex_array_3d(self, vertexArray, attrib):
-        count = len(vertexArray)
-        k = 0
-
-        lineCount = count >> 3
-        for i in range(lineCount):
-            self.indent_write(b"", 1)
-            for j in range(7):
-                self.write_vector_3d(getattr(vertexArray[k], attrib))
-                self.write(b", ")
-                k += 1
-
-            self.write_vector_3d(getattr(vertexArray[k], attrib))
-            k += 1
-
-            if i * 8 < count - 8:
-                self.write(b",\n")
-            else:
-                self.write(b"\n")
-
-        count &= 7
-        if count != 0:
-            self.indent_write(b"", 1)
-            for j in range(count - 1):
-                self.write_vector_3d(getattr(vertexArray[k], attrib))
-                self.write(b", ")
-                k += 1
-
-            self.write_vector_3d(getattr(vertexArray[k], attrib))
-            self.write(b"\n")
-
-    def write_morph_position_array_3d(self, vertexArray, meshVertexArray):
-        count = len(vertexArray)
-        k = 0
-
-        lineCount = count >> 3
-        for i in range(lineCount):
-            self.indent_write(b"", 1)
-            for j in range(7):
-                self.write_vector_3d(meshVertexArray[vertexArray[k].vertexIndex].co)
-                self.write(b", ")
-                k += 1
-
-            self.write_vector_3d(meshVertexArray[vertexArray[k].vertexIndex].co)
-            k += 1
-
-            if i * 8 < count - 8:
-                self.write(b",\n")
-            else:
-                self.write(b"\n")
-
-        count &= 7
-        if count != 0:
-            self.indent_write(b"", 1)
-            for j in range(count - 1):
-                self.write_vector_3d(meshVertexArray[vertexArray[k].vertexIndex].co)
-                self.write(b", ")
-                k += 1
-
-            self.write_vector_3d(meshVertexArray[vertexArray[k].vertexIndex].co)
-            self.write(b"\n")
-
-    def write_morph_normal_array_3d(self, vertexArray, meshVertexArray, tessFaceArray):
-        count = len(vertexArray)
-        k = 0
-
-        lineCount = count >> 3
-        for i in range(lineCount):
-            self.indent_write(b"", 1)
-            for j in range(7):
-                face = tessFaceArray[vertexArray[k].faceIndex]
-                self.write_vector_3d(
-                    meshVertexArray[vertexArray[k].vertexIndex].normal
-                    if (face.use_smooth)
-                    else face.normal
-                )
-                self.write(b", ")
-                k += 1
-
-            face = tessFaceArray[vertexArray[k].faceIndex]
-            self.write_vector_3d(
-                meshVertexArray[vertexArray[k].vertexIndex].normal
-                if (face.use_smooth)
-                else face.normal
-            )
-            k += 1
-
-            if i * 8 < count - 8:
-                self.write(b",\n")
-            else:
-                self.write(b"\n")
-
-        count &= 7
-        if count != 0:
-            self.indent_write(b"", 1)
-            for j in range(count - 1):
-                face = tessFaceArray[vertexArray[k].faceIndex]
-                self.write_vector_3d(
-                    meshVertexArray[vertexArray[k].vertexIndex].normal
-                    if (face.use_smooth)
-                    else face.normal
-                )
-                self.write(b", ")
-                k += 1
+        # OpenGEX stores the scalar part last.
+        f = self.format_float
+        self.write(
+            b"{%s, %s, %s, %s}"
+            % (f(quaternion[1]), f(quaternion[2]), f(quaternion[3]), f(quaternion[0]))
+        )
 
-            face = tessFaceArray[vertexArray[k].faceIndex]
-            self.write_vector_3d(
-                meshVertexArray[vertexArray[k].vertexIndex].normal
-                if (face.use_smooth)
-                else face.normal
-            )
-            self.write(b"\n")
+    def write_vertex_array_2d(self, values):
+        it = iter(self.format_floats(values.ravel()))
+        vectors = [b"{%s, %s}" % xy for xy in zip(it, it)]
+        self.write_token_lines(vectors, 8)
 
-    def write_triangle(self, triangleIndex, indexTable):
-        i = triangleIndex * 3
-        self.write(b"{")
-        self.write_int(indexTable[i])
-        self.write(b", ")
-        self.write_int(indexTable[i + 1])
-        self.write(b", ")
-        self.write_int(indexTable[i + 2])
-        self.write(b"}")
+    def write_vertex_array_3d(self, values):
+        it = iter(self.format_floats(values.ravel()))
+        vectors = [b"{%s, %s, %s}" % xyz for xyz in zip(it, it, it)]
+        self.write_token_lines(vectors, 8)
 
     def write_triangle_array(self, count, indexTable):
-        triangleIndex = 0
-
-        lineCount = count >> 4
-        for i in range(lineCount):
-            self.indent_write(b"", 1)
-            for j in range(15):
-                self.write_triangle(triangleIndex, indexTable)
-                self.write(b", ")
-                triangleIndex += 1
-
-            self.write_triangle(triangleIndex, indexTable)
-            triangleIndex += 1
-
-            if i * 16 < count - 16:
-                self.write(b",\n")
-            else:
-                self.write(b"\n")
-
-        count &= 15
-        if count != 0:
-            self.indent_write(b"", 1)
-            for j in range(count - 1):
-                self.write_triangle(triangleIndex, indexTable)
-                self.write(b", ")
-                triangleIndex += 1
-
-            self.write_triangle(triangleIndex, indexTable)
-            self.write(b"\n")
+        it = iter(indexTable[: count * 3])
+        self.write_token_lines([b"{%d, %d, %d}" % t for t in zip(it, it, it)], 16)
 
     def write_node_table(self, objectRef):
         first = True
@@ -679,7 +468,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
                 self.write(b"\t\t// ")
             else:
                 self.write(b", ")
-            self.write(bytes(node.name, "UTF-8"))
+            self.write(node.name.encode("UTF-8"))
             first = False
 
     @staticmethod
@@ -708,165 +497,179 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
         return None
 
-    def find_node(self, name):
+    def index_nodes_by_name(self):
+        # Objects and bones can share a name, so keep the first node with a
+        # given name, as the original linear scan of nodeArray did.
+        self.nodeByName = {}
         for nodeRef in self.nodeArray.items():
-            if nodeRef[0].name == name:
-                return nodeRef
-        return None
+            self.nodeByName.setdefault(nodeRef[0].name, nodeRef)
+
+    def find_node(self, name):
+        return self.nodeByName.get(name)
 
     @staticmethod
     def deindex_mesh(mesh, materialTable, shouldExportVertexColor=True):
         mesh.calc_loop_triangles()
 
         # This function deindexes all vertex positions, colors, and texcoords.
-        # Three separate ExportVertex structures are created for each triangle.
-
-        vertexArray = mesh.vertices
-        exportVertexArray = []
-        faceIndex = 0
-
-        for face in mesh.loop_triangles:
-            k1 = face.vertices[0]
-            k2 = face.vertices[1]
-            k3 = face.vertices[2]
-
-            v1 = vertexArray[k1]
-            v2 = vertexArray[k2]
-            v3 = vertexArray[k3]
-
-            exportVertex = ExportVertex()
-            exportVertex.vertexIndex = k1
-            exportVertex.faceIndex = faceIndex
-            exportVertex.position = v1.co
-            exportVertex.normal = v1.normal if (face.use_smooth) else face.normal
-            exportVertexArray.append(exportVertex)
-
-            exportVertex = ExportVertex()
-            exportVertex.vertexIndex = k2
-            exportVertex.faceIndex = faceIndex
-            exportVertex.position = v2.co
-            exportVertex.normal = v2.normal if (face.use_smooth) else face.normal
-            exportVertexArray.append(exportVertex)
-
-            exportVertex = ExportVertex()
-            exportVertex.vertexIndex = k3
-            exportVertex.faceIndex = faceIndex
-            exportVertex.position = v3.co
-            exportVertex.normal = v3.normal if (face.use_smooth) else face.normal
-            exportVertexArray.append(exportVertex)
-
-            materialTable.append(face.material_index)
-
-            faceIndex += 1
-
-        colorCount = len(mesh.vertex_colors)
-        if colorCount > 0 and shouldExportVertexColor:
-            colorFace = mesh.vertex_colors[0].data
-            vertexIndex = 0
-            faceIndex = 0
-
-            for face in mesh.loop_triangles:
-                cf = colorFace[faceIndex]
-                exportVertexArray[vertexIndex].color[0] = cf.color[0]
-                vertexIndex += 1
-                exportVertexArray[vertexIndex].color[1] = cf.color[1]
-                vertexIndex += 1
-                exportVertexArray[vertexIndex].color[2] = cf.color[2]
-                vertexIndex += 1
-
-                if len(face.vertices) == 4:
-                    exportVertexArray[vertexIndex].color[0] = cf.color[1]
-                    vertexIndex += 1
-                    exportVertexArray[vertexIndex].color[1] = cf.color[2]
-                    vertexIndex += 1
-                    exportVertexArray[vertexIndex].color[2] = cf.color[3]
-                    vertexIndex += 1
-
-                faceIndex += 1
-
-        uv_layer0 = mesh.uv_layers[0] if len(mesh.uv_layers) > 0 else None
-        uv_layer1 = mesh.uv_layers[1] if len(mesh.uv_layers) > 1 else None
-
-        vertexIndex = 0
-        for tri in mesh.loop_triangles:
-            for loop_index in tri.loops:
-                if uv_layer0:
-                    uv0 = uv_layer0.data[loop_index].uv
-                    exportVertexArray[vertexIndex].texcoord0 = uv0
-
-                if uv_layer1:
-                    uv1 = uv_layer1.data[loop_index].uv
-                    exportVertexArray[vertexIndex].texcoord1 = uv1
-
-                vertexIndex += 1
-
-        for ev in exportVertexArray:
-            ev.Hash()
-
-        return exportVertexArray
+        # Three separate export vertices are created for each triangle.
+        # The mesh data is read in bulk with foreach_get and gathered per
+        # triangle corner with NumPy indexing.
+
+        triangles = mesh.loop_triangles
+        triangleCount = len(triangles)
+        cornerCount = triangleCount * 3
+        loopCount = len(mesh.loops)
+
+        cornerVertices = np.empty(cornerCount, dtype=np.int32)
+        triangles.foreach_get("vertices", cornerVertices)
+        cornerLoops = np.empty(cornerCount, dtype=np.int32)
+        triangles.foreach_get("loops", cornerLoops)
+        useSmooth = np.empty(triangleCount, dtype=bool)
+        triangles.foreach_get("use_smooth", useSmooth)
+        faceNormals = np.empty(triangleCount * 3, dtype=np.single)
+        triangles.foreach_get("normal", faceNormals)
+        materialIndices = np.empty(triangleCount, dtype=np.int32)
+        triangles.foreach_get("material_index", materialIndices)
+
+        vertexCount = len(mesh.vertices)
+        vertexPositions = np.empty(vertexCount * 3, dtype=np.single)
+        mesh.vertices.foreach_get("co", vertexPositions)
+        vertexNormals = np.empty(vertexCount * 3, dtype=np.single)
+        mesh.vertices.foreach_get("normal", vertexNormals)
+
+        positions = vertexPositions.reshape(-1, 3)[cornerVertices]
+        normals = np.where(
+            np.repeat(useSmooth, 3)[:, None],
+            vertexNormals.reshape(-1, 3)[cornerVertices],
+            np.repeat(faceNormals.reshape(-1, 3), 3, axis=0),
+        )
+
+        colors = np.ones((cornerCount, 3), dtype=np.single)
+        if len(mesh.vertex_colors) > 0 and shouldExportVertexColor:
+            loopColors = np.empty(loopCount * 4, dtype=np.single)
+            mesh.vertex_colors[0].data.foreach_get("color", loopColors)
+            colors = loopColors.reshape(-1, 4)[cornerLoops, :3]
+
+        texcoords = []
+        for uvIndex in range(2):
+            texcoord = np.zeros((cornerCount, 2), dtype=np.single)
+            if len(mesh.uv_layers) > uvIndex:
+                loopUVs = np.empty(loopCount * 2, dtype=np.single)
+                mesh.uv_layers[uvIndex].data.foreach_get("uv", loopUVs)
+                texcoord = loopUVs.reshape(-1, 2)[cornerLoops]
+            texcoords.append(texcoord)
+
+        materialTable.extend(materialIndices.tolist())
+
+        return ExportMesh(
+            cornerVertices,
+            np.arange(cornerCount) // 3,
+            positions,
+            normals,
+            colors,
+            texcoords[0],
+            texcoords[1],
+        )
 
     @staticmethod
-    def find_export_vertex(bucket, exportVertexArray, vertex):
-        for index in bucket:
-            if exportVertexArray[index] == vertex:
-                return index
+    def morph_positions(mesh, vertexIndices):
+        vertexPositions = np.empty(len(mesh.vertices) * 3, dtype=np.single)
+        mesh.vertices.foreach_get("co", vertexPositions)
+        return vertexPositions.reshape(-1, 3)[vertexIndices]
 
-        return -1
+    @staticmethod
+    def morph_normals(mesh, vertexIndices, faceIndices):
+        # Chooses between vertex and face normals the same way deindex_mesh
+        # does, for the corners that survived vertex unification.
+        triangles = mesh.loop_triangles
+        triangleCount = len(triangles)
+        useSmooth = np.empty(triangleCount, dtype=bool)
+        triangles.foreach_get("use_smooth", useSmooth)
+        faceNormals = np.empty(triangleCount * 3, dtype=np.single)
+        triangles.foreach_get("normal", faceNormals)
+
+        vertexNormals = np.empty(len(mesh.vertices) * 3, dtype=np.single)
+        mesh.vertices.foreach_get("normal", vertexNormals)
+
+        return np.where(
+            useSmooth[faceIndices][:, None],
+            vertexNormals.reshape(-1, 3)[vertexIndices],
+            faceNormals.reshape(-1, 3)[faceIndices],
+        )
 
     @staticmethod
-    def unify_vertices(exportVertexArray, indexTable):
+    def unify_vertices(exportMesh, indexTable):
         # This function looks for identical vertices having exactly the same position, normal,
         # color, and texcoords. Duplicate vertices are unified, and a new index table is returned.
 
-        bucketCount = len(exportVertexArray) >> 3
-        if bucketCount > 1:
-            # Round down to nearest power of two.
+        rows = np.hstack(
+            (
+                exportMesh.position,
+                exportMesh.normal,
+                exportMesh.color,
+                exportMesh.texcoord0,
+                exportMesh.texcoord1,
+            )
+        )
 
-            while True:
-                count = bucketCount & (bucketCount - 1)
-                if count == 0:
-                    break
-                bucketCount = count
-        else:
-            bucketCount = 1
+        # Adding zero turns -0.0 into 0.0 so that both still compare equal
+        # once each row is keyed on its raw bytes.
+        rows += 0.0
+        keys = rows.view(np.dtype((np.void, rows.shape[1] * rows.itemsize)))
 
-        hashTable = [[] for i in range(bucketCount)]
-        unifiedVertexArray = []
+        _, firstCorners, inverse = np.unique(
+            keys.ravel(), return_index=True, return_inverse=True
+        )
 
-        for i in range(len(exportVertexArray)):
-            ev = exportVertexArray[i]
-            bucket = ev.hash & (bucketCount - 1)
-            index = OpenGexExporter.find_export_vertex(
-                hashTable[bucket], exportVertexArray, ev
-            )
-            if index < 0:
-                indexTable.append(len(unifiedVertexArray))
-                unifiedVertexArray.append(ev)
-                hashTable[bucket].append(i)
-            else:
-                indexTable.append(indexTable[index])
+        # np.unique sorts the rows. Renumber them by first appearance so the
+        # unified vertices keep the order of the mesh's triangle corners.
+        order = np.argsort(firstCorners)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
 
-        return unifiedVertexArray
+        indexTable.extend(rank[inverse].tolist())
+        return exportMesh.take(firstCorners[order])
 
     def process_bone(self, bone):
-        if self.exportAllFlag or bone.select:
-            self.nodeArray[bone] = {
-                "nodeType": NODETYPE_BONE,
-                "structName": bytes("node" + str(len(self.nodeArray) + 1), "UTF-8"),
-            }
+        # Bones are numbered in depth-first order, walked with an explicit stack.
+        stack = [bone]
+
+        while stack:
+            bone = stack.pop()
 
-        for child in bone.children:
-            self.process_bone(child)
+            if self.exportAllFlag or bone.select:
+                self.nodeArray[bone] = {
+                    "nodeType": NODETYPE_BONE,
+                    "structName": b"node%d" % (len(self.nodeArray) + 1),
+                }
+
+            stack.extend(reversed(bone.children))
 
     def process_node(self, node):
+        # Nodes are numbered in depth-first order, walked with an explicit stack.
+        stack = [node]
+
+        while stack:
+            node = stack.pop()
+            self.process_node_ref(node)
+            stack.extend(reversed(node.children))
+
+    def process_node_ref(self, node):
         if self.exportAllFlag or node.select_get():
             node_type = OpenGexExporter.get_node_type(node)
 
             self.nodeArray[node] = {
                 "nodeType": node_type,
-                "structName": bytes("node" + str(len(self.nodeArray) + 1), "UTF-8"),
+                "structName": b"node%d" % (len(self.nodeArray) + 1),
             }
 
+            if node_type == NODETYPE_GEO:
+                # Looked up once here, since both the node and its geometry
+                # need the shape keys later on.
+                shapeKeys = OpenGexExporter.get_shape_keys(node.data)
+                self.nodeArray[node]["shapeKeys"] = shapeKeys
+
             if node.parent_type == "BONE":
                 boneSubnodeArray = self.boneParentArray.get(node.parent_bone)
                 if boneSubnodeArray:
@@ -881,9 +684,6 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
                         if not bone.parent:
                             self.process_bone(bone)
 
-        for child in node.children:
-            self.process_node(child)
-
     def process_skinned_meshes(self):
         for node_ref in self.nodeArray.items():
             if node_ref[1]["nodeType"] == NODETYPE_GEO:
@@ -898,58 +698,48 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
     @staticmethod
     def ClassifyAnimationCurve(fcurve):
-        linearCount = 0
-        bezierCount = 0
-
-        for key in fcurve.keyframe_points:
-            interp = key.interpolation
-            if interp == "LINEAR":
-                linearCount += 1
-            elif interp == "BEZIER":
-                bezierCount += 1
-            else:
-                return ANIMATION_SAMPLED
+        keyframePoints = fcurve.keyframe_points
+        interpolation = np.empty(len(keyframePoints), dtype=np.int32)
+        keyframePoints.foreach_get("interpolation", interpolation)
 
-        if bezierCount == 0:
+        linear = interpolation == INTERPOLATION_LINEAR
+        bezier = interpolation == INTERPOLATION_BEZIER
+        if not np.all(linear | bezier):
+            return ANIMATION_SAMPLED
+
+        if not bezier.any():
             return ANIMATION_LINEAR
-        elif linearCount == 0:
+        elif not linear.any():
             return ANIMATION_BEZIER
 
         return ANIMATION_SAMPLED
 
     @staticmethod
-    def AnimationKeysDifferent(fcurve):
-        keyCount = len(fcurve.keyframe_points)
-        if keyCount > 0:
-            key1 = fcurve.keyframe_points[0].co[1]
+    def keyframe_coordinates(fcurve, attribute):
+        # Reads a keyframe coordinate ("co", "handle_left" or "handle_right") of
+        # every key at once, as rows of (frame, value).
+        keyframePoints = fcurve.keyframe_points
+        co = np.empty(len(keyframePoints) * 2, dtype=np.single)
+        keyframePoints.foreach_get(attribute, co)
+        return co.reshape(-1, 2).astype(np.double)
 
-            for i in range(1, keyCount):
-                key2 = fcurve.keyframe_points[i].co[1]
-                if math.fabs(key2 - key1) > EPSILON:
-                    return True
+    @staticmethod
+    def keyframe_values(fcurve, attribute):
+        return OpenGexExporter.keyframe_coordinates(fcurve, attribute)[:, 1]
 
-        return False
+    @staticmethod
+    def AnimationKeysDifferent(fcurve):
+        values = OpenGexExporter.keyframe_values(fcurve, "co")
+        return bool(np.any(np.abs(values[1:] - values[:1]) > EPSILON))
 
     @staticmethod
     def AnimationTangentsNonzero(fcurve):
-        keyCount = len(fcurve.keyframe_points)
-        if keyCount > 0:
-            key = fcurve.keyframe_points[0].co[1]
-            left = fcurve.keyframe_points[0].handle_left[1]
-            right = fcurve.keyframe_points[0].handle_right[1]
-            if (math.fabs(key - left) > EPSILON) or (math.fabs(right - key) > EPSILON):
-                return True
-
-            for i in range(1, keyCount):
-                key = fcurve.keyframe_points[i].co[1]
-                left = fcurve.keyframe_points[i].handle_left[1]
-                right = fcurve.keyframe_points[i].handle_right[1]
-                if (math.fabs(key - left) > EPSILON) or (
-                    math.fabs(right - key) > EPSILON
-                ):
-                    return True
-
-        return False
+        key = OpenGexExporter.keyframe_values(fcurve, "co")
+        left = OpenGexExporter.keyframe_values(fcurve, "handle_left")
+        right = OpenGexExporter.keyframe_values(fcurve, "handle_right")
+        return bool(
+            np.any((np.abs(key - left) > EPSILON) | (np.abs(right - key) > EPSILON))
+        )
 
     @staticmethod
     def AnimationPresent(fcurve, kind):
@@ -962,163 +752,166 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
     @staticmethod
     def MatricesDifferent(m1, m2):
-        for i in range(4):
-            for j in range(4):
-                if math.fabs(m1[i][j] - m2[i][j]) > EPSILON:
-                    return True
-
-        return False
+        difference = np.array(m1, dtype=np.double) - np.array(m2, dtype=np.double)
+        return bool(np.any(np.abs(difference) > EPSILON))
 
     @staticmethod
-    def CollectBoneAnimation(armature, name):
-        path = 'pose.bones["' + name + '"].'
-        curveArray = []
+    def GroupBoneAnimation(armature):
+        # Sorts the fcurves of the armature's action by the pose bone they
+        # animate, in a single pass over the action.
+        prefix = 'pose.bones["'
+        boneCurves = {}
 
         if armature.animation_data:
             action = armature.animation_data.action
             if action:
                 for fcurve in action.fcurves:
-                    if fcurve.data_path.startswith(path):
-                        # if "location" in fcurve.data_path:
-                        #     action.fcurves.remove(fcurve)
-                        curveArray.append(fcurve)
-
-        return curveArray
-
-    def ExportKeyTimes(self, fcurve):
-        self.indent_write(b"Key {float {")
+                    path = fcurve.data_path
+                    if path.startswith(prefix):
+                        end = path.find('"].', len(prefix))
+                        if end != -1:
+                            name = path[len(prefix) : end]
+                            boneCurves.setdefault(name, []).append(fcurve)
+
+        return boneCurves
+
+    def CollectBoneAnimation(self, armature, name):
+        boneCurves = self.boneCurveArray.get(armature)
+        if boneCurves is None:
+            boneCurves = OpenGexExporter.GroupBoneAnimation(armature)
+            self.boneCurveArray[armature] = boneCurves
+
+        return boneCurves.get(name, [])
+
+    def ExportAnimationHeader(self, action):
+        # Nodes sharing an action share its range as well, so the header is only
+        # formatted the first time the action is seen.
+        header = self.actionHeaderArray.get(action)
+        if header is None:
+            beginFrame, endFrame = action.frame_range
+            header = b"Animation (begin = %s, end = %s)\n" % (
+                self.format_float((beginFrame - self.beginFrame) * self.frameTime),
+                self.format_float((endFrame - self.beginFrame) * self.frameTime),
+            )
+            self.actionHeaderArray[action] = header
 
-        keyCount = len(fcurve.keyframe_points)
-        for i in range(keyCount):
-            if i > 0:
-                self.write(b", ")
+        self.indent_write(header, 0, True)
 
-            time = fcurve.keyframe_points[i].co[0] - self.beginFrame
-            self.write_float(time * self.frameTime)
+    def ExportKeyFloats(self, key, values):
+        # Writes a Key structure holding a flat list of floats.
+        self.indent_write(
+            key + b" {float {" + b", ".join(self.format_floats(values)) + b"}}\n"
+        )
 
-        self.write(b"}}\n")
+    def ExportKeyTimes(self, fcurve):
+        frames = OpenGexExporter.keyframe_coordinates(fcurve, "co")[:, 0]
+        self.ExportKeyFloats(b"Key", (frames - self.beginFrame) * self.frameTime)
 
     def ExportKeyTimeControlPoints(self, fcurve):
-        self.indent_write(b'Key (kind = "-control") {float {')
-
-        keyCount = len(fcurve.keyframe_points)
-        for i in range(keyCount):
-            if i > 0:
-                self.write(b", ")
-
-            ctrl = fcurve.keyframe_points[i].handle_left[0] - self.beginFrame
-            self.write_float(ctrl * self.frameTime)
-
-        self.write(b"}}\n")
-        self.indent_write(b'Key (kind = "+control") {float {')
-
-        for i in range(keyCount):
-            if i > 0:
-                self.write(b", ")
-
-            ctrl = fcurve.keyframe_points[i].handle_right[0] - self.beginFrame
-            self.write_float(ctrl * self.frameTime)
-
-        self.write(b"}}\n")
+        for attribute, key in (
+            ("handle_left", b'Key (kind = "-control")'),
+            ("handle_right", b'Key (kind = "+control")'),
+        ):
+            frames = OpenGexExporter.keyframe_coordinates(fcurve, attribute)[:, 0]
+            self.ExportKeyFloats(key, (frames - self.beginFrame) * self.frameTime)
 
     def ExportKeyValues(self, fcurve):
-        self.indent_write(b"Key {float {")
-
-        keyCount = len(fcurve.keyframe_points)
-        for i in range(keyCount):
-            if i > 0:
-                self.write(b", ")
-
-            value = fcurve.keyframe_points[i].co[1]
-            self.write_float(value)
-
-        self.write(b"}}\n")
+        self.ExportKeyFloats(b"Key", OpenGexExporter.keyframe_values(fcurve, "co"))
 
     def ExportKeyValueControlPoints(self, fcurve):
-        self.indent_write(b'Key (kind = "-control") {float {')
-
-        keyCount = len(fcurve.keyframe_points)
-        for i in range(keyCount):
-            if i > 0:
-                self.write(b", ")
-
-            ctrl = fcurve.keyframe_points[i].handle_left[1]
-            self.write_float(ctrl)
-
-        self.write(b"}}\n")
-        self.indent_write(b'Key (kind = "+control") {float {')
-
-        for i in range(keyCount):
-            if i > 0:
-                self.write(b", ")
+        for attribute, key in (
+            ("handle_left", b'Key (kind = "-control")'),
+            ("handle_right", b'Key (kind = "+control")'),
+        ):
+            values = OpenGexExporter.keyframe_values(fcurve, attribute)
+            self.ExportKeyFloats(key, values)
 
-            ctrl = fcurve.keyframe_points[i].handle_right[1]
-            self.write_float(ctrl)
+    def ExportSampledKeyTimes(self):
+        # Sampled tracks have one key per frame, with times measured from the
+        # first frame of the range. Every sampled node, bone, and morph weight
+        # track shares these times, so they are formatted once per export.
+        if self.sampledKeyTimes is None:
+            frames = np.arange(self.endFrame - self.beginFrame + 1)
+            times = self.format_floats(frames * self.frameTime)
+            self.sampledKeyTimes = b"Key {float {" + b", ".join(times) + b"}}\n"
 
-        self.write(b"}}\n")
+        self.indent_write(self.sampledKeyTimes)
 
     def ExportAnimationTrack(self, fcurve, kind, target, newline):
         # This function exports a single animation track. The curve types for the
         # Time and Value structures are given by the kind parameter.
 
-        self.indent_write(b"Track (target = %", 0, newline)
-        self.write(target)
-        self.write(b")\n")
-        self.indent_write(b"{\n")
-        self.indentLevel += 1
-
-        if kind != ANIMATION_BEZIER:
-            self.indent_write(b"Time\n")
-            self.indent_write(b"{\n")
-            self.indentLevel += 1
-
-            self.ExportKeyTimes(fcurve)
-
-            self.indent_write(b"}\n\n", -1)
-            self.indent_write(b"Value\n", -1)
-            self.indent_write(b"{\n", -1)
-
-            self.ExportKeyValues(fcurve)
-
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
-
-        else:
-            self.indent_write(b'Time (curve = "bezier")\n')
-            self.indent_write(b"{\n")
-            self.indentLevel += 1
+        bezier = kind == ANIMATION_BEZIER
+        curve = b' (curve = "bezier")' if bezier else b""
+        trackIndent = self.indent()
+        keyIndent = self.indent(1)
+
+        self.write(
+            b"%s%sTrack (target = %%%s)\n%s{\n%sTime%s\n%s{\n"
+            % (
+                b"\n" if newline else b"",
+                trackIndent,
+                target,
+                trackIndent,
+                keyIndent,
+                curve,
+                keyIndent,
+            )
+        )
+        self.indentLevel += 2
 
-            self.ExportKeyTimes(fcurve)
+        self.ExportKeyTimes(fcurve)
+        if bezier:
             self.ExportKeyTimeControlPoints(fcurve)
 
-            self.indent_write(b"}\n\n", -1)
-            self.indent_write(b'Value (curve = "bezier")\n', -1)
-            self.indent_write(b"{\n", -1)
+        self.write(
+            b"%s}\n\n%sValue%s\n%s{\n" % (keyIndent, keyIndent, curve, keyIndent)
+        )
 
-            self.ExportKeyValues(fcurve)
+        self.ExportKeyValues(fcurve)
+        if bezier:
             self.ExportKeyValueControlPoints(fcurve)
 
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
+        self.indentLevel -= 2
+        self.write(b"%s}\n%s}\n" % (keyIndent, trackIndent))
 
-        self.indentLevel -= 1
-        self.indent_write(b"}\n")
+    @staticmethod
+    def NodeMayBeAnimated(node):
+        # Keyframes and drivers live in the node's animation data, and constraints
+        # or a rigid body can move it as well. matrix_local only accounts for object
+        # parenting, so any other parent type can move it too. Without any of these
+        # the local matrix is the same on every frame.
+        return bool(
+            (node.animation_data)
+            or (len(node.constraints) != 0)
+            or (node.rigid_body)
+            or ((node.parent) and (node.parent_type != "OBJECT"))
+        )
 
     def ExportNodeSampledAnimation(self, node, scene):
         # This function exports animation as full 4x4 matrices for each frame.
 
+        if not OpenGexExporter.NodeMayBeAnimated(node):
+            return
+
         currentFrame = scene.frame_current
         currentSubframe = scene.frame_subframe
 
-        animationFlag = False
-        m1 = node.matrix_local.copy()
+        # Visit every frame once, keeping the sampled matrices for the output so
+        # the scene doesn't have to be evaluated a second time. Blender stores
+        # transforms in single precision, so float32 holds the samples exactly.
+        # The reference matrix is converted up front as well, which also takes
+        # the copy that was needed before the frame changes.
+        m1 = np.array(node.matrix_local, dtype=np.single)
+        frameCount = self.endFrame - self.beginFrame + 1
+        matrices = np.empty((frameCount, 4, 4), dtype=np.single)
 
-        for i in range(self.beginFrame, self.endFrame):
-            scene.frame_set(i)
-            m2 = node.matrix_local
-            if OpenGexExporter.MatricesDifferent(m1, m2):
-                animationFlag = True
-                break
+        for k in range(frameCount):
+            scene.frame_set(self.beginFrame + k)
+            matrices[k] = node.matrix_local
+
+        # As before, the end frame itself doesn't count towards detection.
+        animationFlag = OpenGexExporter.MatricesDifferent(m1, matrices[:-1])
 
         if animationFlag:
             self.indent_write(b"Animation\n", 0, True)
@@ -1133,13 +926,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             self.indent_write(b"{\n")
             self.indentLevel += 1
 
-            self.indent_write(b"Key {float {")
-
-            for i in range(self.beginFrame, self.endFrame):
-                self.write(b", ")
-
-            self.write_float(self.endFrame * self.frameTime)
-            self.write(b"}}\n")
+            self.ExportSampledKeyTimes()
 
             self.indent_write(b"}\n\n", -1)
             self.indent_write(b"Value\n", -1)
@@ -1152,26 +939,10 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             self.indent_write(b"float[16]\n")
             self.indent_write(b"{\n")
 
-            for i in range(self.beginFrame, self.endFrame):
-                scene.frame_set(i)
-                self.write_matrix_flat(node.matrix_local)
-                self.write(b",\n")
-
-            scene.frame_set(self.endFrame)
-            self.write_matrix_flat(node.matrix_local)
-            self.indent_write(b"}\n", 0, True)
-
-            self.indentLevel -= 1
+            self.write_matrix_array(matrices)
             self.indent_write(b"}\n")
 
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
-
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
-
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
+            self.close_structures(4)
 
         scene.frame_set(currentFrame, subframe=currentSubframe)
 
@@ -1181,15 +952,31 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         currentFrame = scene.frame_current
         currentSubframe = scene.frame_subframe
 
-        animationFlag = False
-        m1 = poseBone.matrix.copy()
+        # Visit every frame once. The pose matrices decide whether the bone is
+        # animated at all, while the parent-relative ones are what gets written.
+        m1 = np.array(poseBone.matrix, dtype=np.single)
+        frameCount = self.endFrame - self.beginFrame + 1
+        poseMatrices = np.empty((frameCount, 4, 4), dtype=np.single)
+        matrices = np.empty((frameCount, 4, 4), dtype=np.single)
 
-        for i in range(self.beginFrame, self.endFrame):
-            scene.frame_set(i)
-            m2 = poseBone.matrix
-            if OpenGexExporter.MatricesDifferent(m1, m2):
-                animationFlag = True
-                break
+        parent = poseBone.parent
+        for k in range(frameCount):
+            scene.frame_set(self.beginFrame + k)
+            matrix = poseBone.matrix
+            poseMatrices[k] = matrix
+
+            if parent:
+                # parent.matrix builds a new Matrix on every access, so fetch
+                # it once for both the determinant test and the inverse.
+                parentMatrix = parent.matrix
+                if abs(parentMatrix.determinant()) > EPSILON:
+                    # replaced the matrix multiplication operator '*' with '@',
+                    # because it no longer works for blender 3.0+
+                    matrix = parentMatrix.inverted() @ matrix
+
+            matrices[k] = matrix
+
+        animationFlag = OpenGexExporter.MatricesDifferent(m1, poseMatrices[:-1])
 
         if animationFlag:
             self.indent_write(b"Animation\n", 0, True)
@@ -1204,14 +991,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             self.indent_write(b"{\n")
             self.indentLevel += 1
 
-            self.indent_write(b"Key {float {")
-
-            for i in range(self.beginFrame, self.endFrame):
-                self.write_float((i - self.beginFrame) * self.frameTime)
-                self.write(b", ")
-
-            self.write_float(self.endFrame * self.frameTime)
-            self.write(b"}}\n")
+            self.ExportSampledKeyTimes()
 
             self.indent_write(b"}\n\n", -1)
             self.indent_write(b"Value\n", -1)
@@ -1224,53 +1004,10 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             self.indent_write(b"float[16]\n")
             self.indent_write(b"{\n")
 
-            parent = poseBone.parent
-            if parent:
-                for i in range(self.beginFrame, self.endFrame):
-                    scene.frame_set(i)
-                    if math.fabs(parent.matrix.determinant()) > EPSILON:
-                        # replaced the matrix multiplication operator '*' with '@',
-                        # because it no longer works for blender 3.0+
-
-                        # ***
-                        self.write_matrix_flat(
-                            parent.matrix.inverted() @ poseBone.matrix
-                        )
-                        # ***
-                    else:
-                        self.write_matrix_flat(poseBone.matrix)
-
-                    self.write(b",\n")
-
-                scene.frame_set(self.endFrame)
-                if math.fabs(parent.matrix.determinant()) > EPSILON:
-                    self.write_matrix_flat(parent.matrix.inverted() @ poseBone.matrix)
-                else:
-                    self.write_matrix_flat(poseBone.matrix)
-
-                self.indent_write(b"}\n", 0, True)
-
-            else:
-                for i in range(self.beginFrame, self.endFrame):
-                    scene.frame_set(i)
-                    self.write_matrix_flat(poseBone.matrix)
-                    self.write(b",\n")
-
-                scene.frame_set(self.endFrame)
-                self.write_matrix_flat(poseBone.matrix)
-                self.indent_write(b"}\n", 0, True)
-
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
-
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
-
-            self.indentLevel -= 1
+            self.write_matrix_array(matrices)
             self.indent_write(b"}\n")
 
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
+            self.close_structures(4)
 
         scene.frame_set(currentFrame, subframe=currentSubframe)
 
@@ -1288,66 +1025,80 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.indent_write(b"{\n")
         self.indentLevel += 1
 
-        self.indent_write(b"Key {float {")
-
-        for i in range(self.beginFrame, self.endFrame):
-            self.write_float((i - self.beginFrame) * self.frameTime)
-            self.write(b", ")
-
-        self.write_float(self.endFrame * self.frameTime)
-        self.write(b"}}\n")
+        self.ExportSampledKeyTimes()
 
         self.indent_write(b"}\n\n", -1)
         self.indent_write(b"Value\n", -1)
         self.indent_write(b"{\n", -1)
 
-        self.indent_write(b"Key {float {")
+        # Sample the weight on every frame first, then format all of the values
+        # in one batch.
+        values = np.empty(self.endFrame - self.beginFrame + 1, dtype=np.single)
+        for k in range(len(values)):
+            scene.frame_set(self.beginFrame + k)
+            values[k] = block.value
 
-        for i in range(self.beginFrame, self.endFrame):
-            scene.frame_set(i)
-            self.write_float(block.value)
-            self.write(b", ")
+        self.ExportKeyFloats(b"Key", values)
 
-        scene.frame_set(self.endFrame)
-        self.write_float(block.value)
-        self.write(b"}}\n")
+        self.close_structures(2)
 
-        self.indentLevel -= 1
-        self.indent_write(b"}\n")
+        scene.frame_set(currentFrame, subframe=currentSubframe)
 
-        self.indentLevel -= 1
-        self.indent_write(b"}\n")
+    @staticmethod
+    def SignificantComponents(vector, identity=0.0):
+        # Flags the components that differ noticeably from the identity value.
+        return np.abs(np.array(vector, dtype=np.double) - identity) > EPSILON
 
-        scene.frame_set(currentFrame, subframe=currentSubframe)
+    def ExportTransformStructure(self, header, newline, dataType, data):
+        # Writes a single Translation, Rotation, or Scale structure holding the
+        # already formatted value or vector.
+
+        self.indent_write(header + b"\n", 0, newline)
+        self.indent_write(b"{\n")
+        self.indent_write(b"%s {%s}" % (dataType, data), 1)
+        self.indent_write(b"}\n", 0, True)
+
+    def ExportAnimatedTransformComponents(
+        self, structure, names, values, animated, axes, structFlag
+    ):
+        # When a transform is animated, write its x, y, and z components separately
+        # so they can be targeted by different tracks having different sets of keys.
+
+        significant = OpenGexExporter.SignificantComponents(values)
+        for axis in axes:
+            if (animated[axis]) or (significant[axis]):
+                self.ExportTransformStructure(
+                    b'%s %%%s (kind = "%s")' % (structure, names[axis], axisName[axis]),
+                    structFlag,
+                    b"float",
+                    self.format_float(values[axis]),
+                )
+                structFlag = True
+
+        return structFlag
+
+    def ExportEulerRotations(self, angles, axes, structFlag):
+        significant = OpenGexExporter.SignificantComponents(angles)
+        for axis in axes:
+            if significant[axis]:
+                self.ExportTransformStructure(
+                    b'Rotation (kind = "%s")' % axisName[axis],
+                    structFlag,
+                    b"float",
+                    self.format_float(angles[axis]),
+                )
+                structFlag = True
+
+        return structFlag
 
     def ExportNodeTransform(self, node, scene):
-        posAnimCurve = [None, None, None]
-        rotAnimCurve = [None, None, None]
-        sclAnimCurve = [None, None, None]
-        posAnimKind = [0, 0, 0]
-        rotAnimKind = [0, 0, 0]
-        sclAnimKind = [0, 0, 0]
-
-        deltaPosAnimCurve = [None, None, None]
-        deltaRotAnimCurve = [None, None, None]
-        deltaSclAnimCurve = [None, None, None]
-        deltaPosAnimKind = [0, 0, 0]
-        deltaRotAnimKind = [0, 0, 0]
-        deltaSclAnimKind = [0, 0, 0]
-
-        positionAnimated = False
-        rotationAnimated = False
-        scaleAnimated = False
-        posAnimated = [False, False, False]
-        rotAnimated = [False, False, False]
-        sclAnimated = [False, False, False]
-
-        deltaPositionAnimated = False
-        deltaRotationAnimated = False
-        deltaScaleAnimated = False
-        deltaPosAnimated = [False, False, False]
-        deltaRotAnimated = [False, False, False]
-        deltaSclAnimated = [False, False, False]
+        posChannels = TransformChannels()
+        rotChannels = TransformChannels()
+        sclChannels = TransformChannels()
+
+        deltaPosChannels = TransformChannels()
+        deltaRotChannels = TransformChannels()
+        deltaSclChannels = TransformChannels()
 
         mode = node.rotation_mode
         sampledAnimation = (
@@ -1359,57 +1110,27 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         if (not sampledAnimation) and (node.animation_data):
             action = node.animation_data.action
             if action:
+                # Keyframed channels, by the data path their fcurves animate.
+                channelsByPath = {
+                    "location": posChannels,
+                    "delta_location": deltaPosChannels,
+                    "rotation_euler": rotChannels,
+                    "delta_rotation_euler": deltaRotChannels,
+                    "scale": sclChannels,
+                    "delta_scale": deltaSclChannels,
+                }
+
                 for fcurve in action.fcurves:
                     kind = OpenGexExporter.ClassifyAnimationCurve(fcurve)
                     if kind != ANIMATION_SAMPLED:
-                        if fcurve.data_path == "location":
-                            for i in range(3):
-                                if (fcurve.array_index == i) and (not posAnimCurve[i]):
-                                    posAnimCurve[i] = fcurve
-                                    posAnimKind[i] = kind
-                                    if OpenGexExporter.AnimationPresent(fcurve, kind):
-                                        posAnimated[i] = True
-                        elif fcurve.data_path == "delta_location":
-                            for i in range(3):
-                                if (fcurve.array_index == i) and (
-                                    not deltaPosAnimCurve[i]
-                                ):
-                                    deltaPosAnimCurve[i] = fcurve
-                                    deltaPosAnimKind[i] = kind
-                                    if OpenGexExporter.AnimationPresent(fcurve, kind):
-                                        deltaPosAnimated[i] = True
-                        elif fcurve.data_path == "rotation_euler":
-                            for i in range(3):
-                                if (fcurve.array_index == i) and (not rotAnimCurve[i]):
-                                    rotAnimCurve[i] = fcurve
-                                    rotAnimKind[i] = kind
-                                    if OpenGexExporter.AnimationPresent(fcurve, kind):
-                                        rotAnimated[i] = True
-                        elif fcurve.data_path == "delta_rotation_euler":
-                            for i in range(3):
-                                if (fcurve.array_index == i) and (
-                                    not deltaRotAnimCurve[i]
-                                ):
-                                    deltaRotAnimCurve[i] = fcurve
-                                    deltaRotAnimKind[i] = kind
-                                    if OpenGexExporter.AnimationPresent(fcurve, kind):
-                                        deltaRotAnimated[i] = True
-                        elif fcurve.data_path == "scale":
-                            for i in range(3):
-                                if (fcurve.array_index == i) and (not sclAnimCurve[i]):
-                                    sclAnimCurve[i] = fcurve
-                                    sclAnimKind[i] = kind
-                                    if OpenGexExporter.AnimationPresent(fcurve, kind):
-                                        sclAnimated[i] = True
-                        elif fcurve.data_path == "delta_scale":
-                            for i in range(3):
-                                if (fcurve.array_index == i) and (
-                                    not deltaSclAnimCurve[i]
-                                ):
-                                    deltaSclAnimCurve[i] = fcurve
-                                    deltaSclAnimKind[i] = kind
-                                    if OpenGexExporter.AnimationPresent(fcurve, kind):
-                                        deltaSclAnimated[i] = True
+                        channels = channelsByPath.get(fcurve.data_path)
+                        if channels:
+                            i = fcurve.array_index
+                            if (i < 3) and (not channels.curves[i]):
+                                channels.curves[i] = fcurve
+                                channels.kinds[i] = kind
+                                if OpenGexExporter.AnimationPresent(fcurve, kind):
+                                    channels.animated[i] = True
                         elif (
                             (fcurve.data_path == "rotation_axis_angle")
                             or (fcurve.data_path == "rotation_quaternion")
@@ -1421,19 +1142,13 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
                         sampledAnimation = True
                         break
 
-        positionAnimated = posAnimated[0] | posAnimated[1] | posAnimated[2]
-        rotationAnimated = rotAnimated[0] | rotAnimated[1] | rotAnimated[2]
-        scaleAnimated = sclAnimated[0] | sclAnimated[1] | sclAnimated[2]
+        positionAnimated = posChannels.animated.any()
+        rotationAnimated = rotChannels.animated.any()
+        scaleAnimated = sclChannels.animated.any()
 
-        deltaPositionAnimated = (
-            deltaPosAnimated[0] | deltaPosAnimated[1] | deltaPosAnimated[2]
-        )
-        deltaRotationAnimated = (
-            deltaRotAnimated[0] | deltaRotAnimated[1] | deltaRotAnimated[2]
-        )
-        deltaScaleAnimated = (
-            deltaSclAnimated[0] | deltaSclAnimated[1] | deltaSclAnimated[2]
-        )
+        deltaPositionAnimated = deltaPosChannels.animated.any()
+        deltaRotationAnimated = deltaRotChannels.animated.any()
+        deltaScaleAnimated = deltaSclChannels.animated.any()
 
         if (sampledAnimation) or (
             (not positionAnimated)
@@ -1468,96 +1183,55 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         else:
             structFlag = False
 
+            # Keyframed transforms are only exported this way in Euler modes.
+            eulerAxes = eulerAxisOrder[mode]
+
             deltaTranslation = node.delta_location
             if deltaPositionAnimated:
-                # When the delta location is animated, write the x, y, and z components separately
-                # so they can be targeted by different tracks having different sets of keys.
-
-                for i in range(3):
-                    pos = deltaTranslation[i]
-                    if (deltaPosAnimated[i]) or (math.fabs(pos) > EPSILON):
-                        self.indent_write(b"Translation %", 0, structFlag)
-                        self.write(deltaSubtranslationName[i])
-                        self.write(b' (kind = "')
-                        self.write(axisName[i])
-                        self.write(b'")\n')
-                        self.indent_write(b"{\n")
-                        self.indent_write(b"float {", 1)
-                        self.write_float(pos)
-                        self.write(b"}")
-                        self.indent_write(b"}\n", 0, True)
-
-                        structFlag = True
-
-            elif (
-                (math.fabs(deltaTranslation[0]) > EPSILON)
-                or (math.fabs(deltaTranslation[1]) > EPSILON)
-                or (math.fabs(deltaTranslation[2]) > EPSILON)
-            ):
-                self.indent_write(b"Translation\n")
-                self.indent_write(b"{\n")
-                self.indent_write(b"float[3] {", 1)
-                self.write_vector_3d(deltaTranslation)
-                self.write(b"}")
-                self.indent_write(b"}\n", 0, True)
+                structFlag = self.ExportAnimatedTransformComponents(
+                    b"Translation",
+                    deltaSubtranslationName,
+                    deltaTranslation,
+                    deltaPosChannels.animated,
+                    range(3),
+                    structFlag,
+                )
 
+            elif OpenGexExporter.SignificantComponents(deltaTranslation).any():
+                self.ExportTransformStructure(
+                    b"Translation",
+                    False,
+                    b"float[3]",
+                    self.format_vector(deltaTranslation),
+                )
                 structFlag = True
 
             translation = node.location
             if positionAnimated:
-                # When the location is animated, write the x, y, and z components separately
-                # so they can be targeted by different tracks having different sets of keys.
-
-                for i in range(3):
-                    pos = translation[i]
-                    if (posAnimated[i]) or (math.fabs(pos) > EPSILON):
-                        self.indent_write(b"Translation %", 0, structFlag)
-                        self.write(subtranslationName[i])
-                        self.write(b' (kind = "')
-                        self.write(axisName[i])
-                        self.write(b'")\n')
-                        self.indent_write(b"{\n")
-                        self.indent_write(b"float {", 1)
-                        self.write_float(pos)
-                        self.write(b"}")
-                        self.indent_write(b"}\n", 0, True)
-
-                        structFlag = True
-
-            elif (
-                (math.fabs(translation[0]) > EPSILON)
-                or (math.fabs(translation[1]) > EPSILON)
-                or (math.fabs(translation[2]) > EPSILON)
-            ):
-                self.indent_write(b"Translation\n")
-                self.indent_write(b"{\n")
-                self.indent_write(b"float[3] {", 1)
-                self.write_vector_3d(translation)
-                self.write(b"}")
-                self.indent_write(b"}\n", 0, True)
+                structFlag = self.ExportAnimatedTransformComponents(
+                    b"Translation",
+                    subtranslationName,
+                    translation,
+                    posChannels.animated,
+                    range(3),
+                    structFlag,
+                )
 
+            elif OpenGexExporter.SignificantComponents(translation).any():
+                self.ExportTransformStructure(
+                    b"Translation", False, b"float[3]", self.format_vector(translation)
+                )
                 structFlag = True
 
             if deltaRotationAnimated:
-                # When the delta rotation is animated, write three separate Euler angle rotations
-                # so they can be targeted by different tracks having different sets of keys.
-
-                for i in range(3):
-                    axis = ord(mode[2 - i]) - 0x58
-                    angle = node.delta_rotation_euler[axis]
-                    if (deltaRotAnimated[axis]) or (math.fabs(angle) > EPSILON):
-                        self.indent_write(b"Rotation %", 0, structFlag)
-                        self.write(deltaSubrotationName[axis])
-                        self.write(b' (kind = "')
-                        self.write(axisName[axis])
-                        self.write(b'")\n')
-                        self.indent_write(b"{\n")
-                        self.indent_write(b"float {", 1)
-                        self.write_float(angle)
-                        self.write(b"}")
-                        self.indent_write(b"}\n", 0, True)
-
-                        structFlag = True
+                structFlag = self.ExportAnimatedTransformComponents(
+                    b"Rotation",
+                    deltaSubrotationName,
+                    node.delta_rotation_euler,
+                    deltaRotChannels.animated,
+                    eulerAxes,
+                    structFlag,
+                )
 
             else:
                 # When the delta rotation is not animated, write it in the representation given by
@@ -1565,59 +1239,31 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
                 if mode == "QUATERNION":
                     quaternion = node.delta_rotation_quaternion
-                    if (
-                        (math.fabs(quaternion[0] - 1.0) > EPSILON)
-                        or (math.fabs(quaternion[1]) > EPSILON)
-                        or (math.fabs(quaternion[2]) > EPSILON)
-                        or (math.fabs(quaternion[3]) > EPSILON)
-                    ):
-                        self.indent_write(
-                            b'Rotation (kind = "quaternion")\n', 0, structFlag
+                    if OpenGexExporter.SignificantComponents(
+                        quaternion, (1.0, 0.0, 0.0, 0.0)
+                    ).any():
+                        self.ExportTransformStructure(
+                            b'Rotation (kind = "quaternion")',
+                            structFlag,
+                            b"float[4]",
+                            self.format_quaternion(quaternion),
                         )
-                        self.indent_write(b"{\n")
-                        self.indent_write(b"float[4] {", 1)
-                        self.write_quaternion(quaternion)
-                        self.write(b"}")
-                        self.indent_write(b"}\n", 0, True)
-
                         structFlag = True
 
                 else:
-                    for i in range(3):
-                        axis = ord(mode[2 - i]) - 0x58
-                        angle = node.delta_rotation_euler[axis]
-                        if math.fabs(angle) > EPSILON:
-                            self.indent_write(b'Rotation (kind = "', 0, structFlag)
-                            self.write(axisName[axis])
-                            self.write(b'")\n')
-                            self.indent_write(b"{\n")
-                            self.indent_write(b"float {", 1)
-                            self.write_float(angle)
-                            self.write(b"}")
-                            self.indent_write(b"}\n", 0, True)
-
-                            structFlag = True
+                    structFlag = self.ExportEulerRotations(
+                        node.delta_rotation_euler, eulerAxes, structFlag
+                    )
 
             if rotationAnimated:
-                # When the rotation is animated, write three separate Euler angle rotations
-                # so they can be targeted by different tracks having different sets of keys.
-
-                for i in range(3):
-                    axis = ord(mode[2 - i]) - 0x58
-                    angle = node.rotation_euler[axis]
-                    if (rotAnimated[axis]) or (math.fabs(angle) > EPSILON):
-                        self.indent_write(b"Rotation %", 0, structFlag)
-                        self.write(subrotationName[axis])
-                        self.write(b' (kind = "')
-                        self.write(axisName[axis])
-                        self.write(b'")\n')
-                        self.indent_write(b"{\n")
-                        self.indent_write(b"float {", 1)
-                        self.write_float(angle)
-                        self.write(b"}")
-                        self.indent_write(b"}\n", 0, True)
-
-                        structFlag = True
+                structFlag = self.ExportAnimatedTransformComponents(
+                    b"Rotation",
+                    subrotationName,
+                    node.rotation_euler,
+                    rotChannels.animated,
+                    eulerAxes,
+                    structFlag,
+                )
 
             else:
                 # When the rotation is not animated, write it in the representation given by
@@ -1625,194 +1271,87 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
                 if mode == "QUATERNION":
                     quaternion = node.rotation_quaternion
-                    if (
-                        (math.fabs(quaternion[0] - 1.0) > EPSILON)
-                        or (math.fabs(quaternion[1]) > EPSILON)
-                        or (math.fabs(quaternion[2]) > EPSILON)
-                        or (math.fabs(quaternion[3]) > EPSILON)
-                    ):
-                        self.indent_write(
-                            b'Rotation (kind = "quaternion")\n', 0, structFlag
+                    if OpenGexExporter.SignificantComponents(
+                        quaternion, (1.0, 0.0, 0.0, 0.0)
+                    ).any():
+                        self.ExportTransformStructure(
+                            b'Rotation (kind = "quaternion")',
+                            structFlag,
+                            b"float[4]",
+                            self.format_quaternion(quaternion),
                         )
-                        self.indent_write(b"{\n")
-                        self.indent_write(b"float[4] {", 1)
-                        self.write_quaternion(quaternion)
-                        self.write(b"}")
-                        self.indent_write(b"}\n", 0, True)
-
                         structFlag = True
 
                 elif mode == "AXIS_ANGLE":
-                    if math.fabs(node.rotation_axis_angle[0]) > EPSILON:
-                        self.indent_write(b'Rotation (kind = "axis")\n', 0, structFlag)
-                        self.indent_write(b"{\n")
-                        self.indent_write(b"float[4] {", 1)
-                        self.write_vector_4d(node.rotation_axis_angle)
-                        self.write(b"}")
-                        self.indent_write(b"}\n", 0, True)
-
+                    if abs(node.rotation_axis_angle[0]) > EPSILON:
+                        self.ExportTransformStructure(
+                            b'Rotation (kind = "axis")',
+                            structFlag,
+                            b"float[4]",
+                            self.format_vector(node.rotation_axis_angle),
+                        )
                         structFlag = True
 
                 else:
-                    for i in range(3):
-                        axis = ord(mode[2 - i]) - 0x58
-                        angle = node.rotation_euler[axis]
-                        if math.fabs(angle) > EPSILON:
-                            self.indent_write(b'Rotation (kind = "', 0, structFlag)
-                            self.write(axisName[axis])
-                            self.write(b'")\n')
-                            self.indent_write(b"{\n")
-                            self.indent_write(b"float {", 1)
-                            self.write_float(angle)
-                            self.write(b"}")
-                            self.indent_write(b"}\n", 0, True)
-
-                            structFlag = True
+                    structFlag = self.ExportEulerRotations(
+                        node.rotation_euler, eulerAxes, structFlag
+                    )
 
             deltaScale = node.delta_scale
             if deltaScaleAnimated:
-                # When the delta scale is animated, write the x, y, and z components separately
-                # so they can be targeted by different tracks having different sets of keys.
-
-                for i in range(3):
-                    scl = deltaScale[i]
-                    if (deltaSclAnimated[i]) or (math.fabs(scl) > EPSILON):
-                        self.indent_write(b"Scale %", 0, structFlag)
-                        self.write(deltaSubscaleName[i])
-                        self.write(b' (kind = "')
-                        self.write(axisName[i])
-                        self.write(b'")\n')
-                        self.indent_write(b"{\n")
-                        self.indent_write(b"float {", 1)
-                        self.write_float(scl)
-                        self.write(b"}")
-                        self.indent_write(b"}\n", 0, True)
-
-                        structFlag = True
-
-            elif (
-                (math.fabs(deltaScale[0] - 1.0) > EPSILON)
-                or (math.fabs(deltaScale[1] - 1.0) > EPSILON)
-                or (math.fabs(deltaScale[2] - 1.0) > EPSILON)
-            ):
-                self.indent_write(b"Scale\n", 0, structFlag)
-                self.indent_write(b"{\n")
-                self.indent_write(b"float[3] {", 1)
-                self.write_vector_3d(deltaScale)
-                self.write(b"}")
-                self.indent_write(b"}\n", 0, True)
+                structFlag = self.ExportAnimatedTransformComponents(
+                    b"Scale",
+                    deltaSubscaleName,
+                    deltaScale,
+                    deltaSclChannels.animated,
+                    range(3),
+                    structFlag,
+                )
 
+            elif OpenGexExporter.SignificantComponents(deltaScale, 1.0).any():
+                self.ExportTransformStructure(
+                    b"Scale", structFlag, b"float[3]", self.format_vector(deltaScale)
+                )
                 structFlag = True
 
             scale = node.scale
             if scaleAnimated:
-                # When the scale is animated, write the x, y, and z components separately
-                # so they can be targeted by different tracks having different sets of keys.
-
-                for i in range(3):
-                    scl = scale[i]
-                    if (sclAnimated[i]) or (math.fabs(scl) > EPSILON):
-                        self.indent_write(b"Scale %", 0, structFlag)
-                        self.write(subscaleName[i])
-                        self.write(b' (kind = "')
-                        self.write(axisName[i])
-                        self.write(b'")\n')
-                        self.indent_write(b"{\n")
-                        self.indent_write(b"float {", 1)
-                        self.write_float(scl)
-                        self.write(b"}")
-                        self.indent_write(b"}\n", 0, True)
-
-                        structFlag = True
-
-            elif (
-                (math.fabs(scale[0] - 1.0) > EPSILON)
-                or (math.fabs(scale[1] - 1.0) > EPSILON)
-                or (math.fabs(scale[2] - 1.0) > EPSILON)
-            ):
-                self.indent_write(b"Scale\n", 0, structFlag)
-                self.indent_write(b"{\n")
-                self.indent_write(b"float[3] {", 1)
-                self.write_vector_3d(scale)
-                self.write(b"}")
-                self.indent_write(b"}\n", 0, True)
+                structFlag = self.ExportAnimatedTransformComponents(
+                    b"Scale",
+                    subscaleName,
+                    scale,
+                    sclChannels.animated,
+                    range(3),
+                    structFlag,
+                )
 
+            elif OpenGexExporter.SignificantComponents(scale, 1.0).any():
+                self.ExportTransformStructure(
+                    b"Scale", structFlag, b"float[3]", self.format_vector(scale)
+                )
                 structFlag = True
 
             # Export the animation tracks.
 
-            self.indent_write(b"Animation (begin = ", 0, True)
-            self.write_float((action.frame_range[0] - self.beginFrame) * self.frameTime)
-            self.write(b", end = ")
-            self.write_float((action.frame_range[1] - self.beginFrame) * self.frameTime)
-            self.write(b")\n")
+            self.ExportAnimationHeader(action)
             self.indent_write(b"{\n")
             self.indentLevel += 1
 
             structFlag = False
 
-            if positionAnimated:
-                for i in range(3):
-                    if posAnimated[i]:
-                        self.ExportAnimationTrack(
-                            posAnimCurve[i],
-                            posAnimKind[i],
-                            subtranslationName[i],
-                            structFlag,
-                        )
-                        structFlag = True
-
-            if rotationAnimated:
-                for i in range(3):
-                    if rotAnimated[i]:
-                        self.ExportAnimationTrack(
-                            rotAnimCurve[i],
-                            rotAnimKind[i],
-                            subrotationName[i],
-                            structFlag,
-                        )
-                        structFlag = True
-
-            if scaleAnimated:
-                for i in range(3):
-                    if sclAnimated[i]:
-                        self.ExportAnimationTrack(
-                            sclAnimCurve[i], sclAnimKind[i], subscaleName[i], structFlag
-                        )
-                        structFlag = True
-
-            if deltaPositionAnimated:
-                for i in range(3):
-                    if deltaPosAnimated[i]:
-                        self.ExportAnimationTrack(
-                            deltaPosAnimCurve[i],
-                            deltaPosAnimKind[i],
-                            deltaSubtranslationName[i],
-                            structFlag,
-                        )
-                        structFlag = True
-
-            if deltaRotationAnimated:
-                for i in range(3):
-                    if deltaRotAnimated[i]:
-                        self.ExportAnimationTrack(
-                            deltaRotAnimCurve[i],
-                            deltaRotAnimKind[i],
-                            deltaSubrotationName[i],
-                            structFlag,
-                        )
-                        structFlag = True
-
-            if deltaScaleAnimated:
-                for i in range(3):
-                    if deltaSclAnimated[i]:
-                        self.ExportAnimationTrack(
-                            deltaSclAnimCurve[i],
-                            deltaSclAnimKind[i],
-                            deltaSubscaleName[i],
-                            structFlag,
-                        )
-                        structFlag = True
+            for channels, names in (
+                (posChannels, subtranslationName),
+                (rotChannels, subrotationName),
+                (sclChannels, subscaleName),
+                (deltaPosChannels, deltaSubtranslationName),
+                (deltaRotChannels, deltaSubrotationName),
+                (deltaSclChannels, deltaSubscaleName),
+            ):
+                for i in np.flatnonzero(channels.animated):
+                    self.ExportAnimationTrack(
+                        channels.curves[i], channels.kinds[i], names[i], structFlag
+                    )
+                    structFlag = True
 
             self.indentLevel -= 1
             self.indent_write(b"}\n")
@@ -1833,21 +1372,34 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         curveArray = self.CollectBoneAnimation(armature, bone.name)
         animation = (len(curveArray) != 0) or (self.sampleAnimationFlag)
 
-        transform = bone.matrix_local.copy()
-        parentBone = bone.parent
-
-        if parentBone:
-            transform = parentBone.matrix_local.inverted_safe() @ transform
-
+        # Every child of a bone is expressed relative to it, so each parent's
+        # inverse is computed once and shared by all of its children. The rest
+        # transform is only needed when the bone has no pose. The matrix is
+        # written before any frame changes, so it is used without a copy.
         pose_bone = armature.pose.bones.get(bone.name)
 
         if pose_bone:
             print(pose_bone)
-            transform = pose_bone.matrix.copy()
+            transform = pose_bone.matrix
             pose_bone_parent = pose_bone.parent
 
             if pose_bone_parent:
-                transform = pose_bone_parent.matrix.inverted_safe() @ transform
+                inverse = self.poseInverseArray.get(pose_bone_parent)
+                if inverse is None:
+                    inverse = pose_bone_parent.matrix.inverted_safe()
+                    self.poseInverseArray[pose_bone_parent] = inverse
+                transform = inverse @ transform
+
+        else:
+            transform = bone.matrix_local
+            parentBone = bone.parent
+
+            if parentBone:
+                inverse = self.boneInverseArray.get(parentBone)
+                if inverse is None:
+                    inverse = parentBone.matrix_local.inverted_safe()
+                    self.boneInverseArray[parentBone] = inverse
+                transform = inverse @ transform
 
         # transform bone matrix to include parent object tranforms
         # transform = armature.matrix_world @ transform
@@ -1872,57 +1424,67 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             self.ExportBoneSampledAnimation(pose_bone, scene)
 
     def ExportMaterialRef(self, material, index):
-        if not material in self.materialArray:
-            self.materialArray[material] = {
-                "structName": bytes(
-                    "material" + str(len(self.materialArray) + 1), "UTF-8"
-                )
+        materialRef = self.materialArray.get(material)
+        if materialRef is None:
+            materialRef = self.materialArray[material] = {
+                "structName": b"material%d" % (len(self.materialArray) + 1)
             }
 
         self.indent_write(b"MaterialRef (index = ")
         self.write_int(index)
         self.write(b") {ref {$")
-        self.write(self.materialArray[material]["structName"])
+        self.write(materialRef["structName"])
         self.write(b"}}\n")
 
+    @staticmethod
+    def CollectMorphAnimation(action, keyIndices, objectAction):
+        # Finds the fcurves of the action that animate shape key values, along with
+        # the index of each key block. An object's action reaches the values through
+        # its data, while the shape keys' own action refers to them directly.
+        # keyIndices maps the names of the key blocks to their indices.
+
+        curveArray = []
+        indexArray = []
+
+        for fcurve in action.fcurves:
+            match = keyBlockPath.fullmatch(fcurve.data_path)
+            if (match) and ((match.group(1) is not None) == objectAction):
+                keyName, index = match.group(2, 3)
+                if keyName is not None:
+                    index = keyIndices.get(keyName, -1)
+                    if index >= 0:
+                        curveArray.append(fcurve)
+                        indexArray.append(index)
+                else:
+                    curveArray.append(fcurve)
+                    indexArray.append(int(index))
+
+        return curveArray, indexArray
+
     def ExportMorphWeights(self, node, shapeKeys, scene):
         action = None
         curveArray = []
         indexArray = []
 
+        # Look key blocks up by name in a table built once, rather than searching
+        # the collection again for every fcurve.
+        keyIndices = {}
+        for k, block in enumerate(shapeKeys.key_blocks):
+            keyIndices.setdefault(block.name, k)
+
         if shapeKeys.animation_data:
             action = shapeKeys.animation_data.action
             if action:
-                for fcurve in action.fcurves:
-                    if (fcurve.data_path.startswith("key_blocks[")) and (
-                        fcurve.data_path.endswith("].value")
-                    ):
-                        keyName = fcurve.data_path.strip("abcdehklopstuvy[]_.")
-                        if (keyName[0] == '"') or (keyName[0] == "'"):
-                            index = shapeKeys.key_blocks.find(keyName.strip("\"'"))
-                            if index >= 0:
-                                curveArray.append(fcurve)
-                                indexArray.append(index)
-                        else:
-                            curveArray.append(fcurve)
-                            indexArray.append(int(keyName))
+                curveArray, indexArray = OpenGexExporter.CollectMorphAnimation(
+                    action, keyIndices, False
+                )
 
         if (not action) and (node.animation_data):
             action = node.animation_data.action
             if action:
-                for fcurve in action.fcurves:
-                    if (
-                        fcurve.data_path.startswith("data.shape_keys.key_blocks[")
-                    ) and (fcurve.data_path.endswith("].value")):
-                        keyName = fcurve.data_path.strip("abcdehklopstuvy[]_.")
-                        if (keyName[0] == '"') or (keyName[0] == "'"):
-                            index = shapeKeys.key_blocks.find(keyName.strip("\"'"))
-                            if index >= 0:
-                                curveArray.append(fcurve)
-                                indexArray.append(index)
-                        else:
-                            curveArray.append(fcurve)
-                            indexArray.append(int(keyName))
+                curveArray, indexArray = OpenGexExporter.CollectMorphAnimation(
+                    action, keyIndices, True
+                )
 
         animated = len(curveArray) != 0
         referenceName = shapeKeys.reference_key.name if (shapeKeys.use_relative) else ""
@@ -1944,23 +1506,23 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             self.write(b"}}\n")
 
         if animated:
-            self.indent_write(b"Animation (begin = ", 0, True)
-            self.write_float((action.frame_range[0] - self.beginFrame) * self.frameTime)
-            self.write(b", end = ")
-            self.write_float((action.frame_range[1] - self.beginFrame) * self.frameTime)
-            self.write(b")\n")
+            self.ExportAnimationHeader(action)
             self.indent_write(b"{\n")
             self.indentLevel += 1
 
             structFlag = False
 
-            for a in range(len(curveArray)):
-                k = indexArray[a]
-                target = bytes("mw" + str(k), "UTF-8")
+            # When every track is sampled anyway, the curves don't need to be
+            # classified.
+            kind = ANIMATION_SAMPLED
 
-                fcurve = curveArray[a]
-                kind = OpenGexExporter.ClassifyAnimationCurve(fcurve)
-                if (kind != ANIMATION_SAMPLED) and (not self.sampleAnimationFlag):
+            for fcurve, k in zip(curveArray, indexArray):
+                target = b"mw%d" % k
+
+                if not self.sampleAnimationFlag:
+                    kind = OpenGexExporter.ClassifyAnimationCurve(fcurve)
+
+                if kind != ANIMATION_SAMPLED:
                     self.ExportAnimationTrack(fcurve, kind, target, structFlag)
                 else:
                     self.ExportMorphWeightSampledAnimationTrack(
@@ -1973,175 +1535,200 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             self.indent_write(b"}\n")
 
     def export_bone(self, armature, bone, scene):
-        node_ref = self.nodeArray.get(bone)
+        # The bone hierarchy is walked depth first with an explicit stack rather
+        # than recursion. Each bone goes back on the stack beneath its children,
+        # so its bone-parented nodes and closing brace are written after them.
+        stack = [(bone, False)]
 
-        if node_ref:
-            self.indent_write(structIdentifier[node_ref["nodeType"]], 0, True)
-            self.write(node_ref["structName"])
+        while stack:
+            bone, childrenDone = stack.pop()
+            node_ref = self.nodeArray.get(bone)
 
-            self.indent_write(b"{\n", 0, True)
-            self.indentLevel += 1
+            if not childrenDone:
+                if node_ref:
+                    self.indent_write(structIdentifier[node_ref["nodeType"]], 0, True)
+                    self.write(node_ref["structName"])
+
+                    self.indent_write(b"{\n", 0, True)
+                    self.indentLevel += 1
 
-            name = bone.name
-            if name != "":
-                self.indent_write(b'Name {string {"')
-                self.write(bytes(name, "UTF-8"))
-                self.write(b'"}}\n\n')
+                    name = bone.name
+                    if name != "":
+                        self.indent_write(b'Name {string {"')
+                        self.write(name.encode("UTF-8"))
+                        self.write(b'"}}\n\n')
 
-            self.export_bone_transform(armature, bone, scene)
+                    self.export_bone_transform(armature, bone, scene)
 
-        for subnode in bone.children:
-            self.export_bone(armature, subnode, scene)
+                stack.append((bone, True))
+                stack.extend((subnode, False) for subnode in reversed(bone.children))
+                continue
 
-        # Export any ordinary nodes that are parented to this bone.
+            # Export any ordinary nodes that are parented to this bone.
 
-        boneSubnodeArray = self.boneParentArray.get(bone.name)
-        if boneSubnodeArray:
-            poseBone = None
-            if not bone.use_relative_parent:
-                poseBone = armature.pose.bones.get(bone.name)
+            boneSubnodeArray = self.boneParentArray.get(bone.name)
+            if boneSubnodeArray:
+                poseBone = None
+                if not bone.use_relative_parent:
+                    poseBone = armature.pose.bones.get(bone.name)
 
-            for subnode in boneSubnodeArray:
-                self.export_node(subnode, scene, poseBone)
+                for subnode in boneSubnodeArray:
+                    self.export_node(subnode, scene, poseBone)
 
-        if node_ref:
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
+            if node_ref:
+                self.indentLevel -= 1
+                self.indent_write(b"}\n")
 
     def export_node(self, node, scene, poseBone=None):
         # This function exports a single node in the scene and includes its name,
         # object reference, material references (for geometries), and transform.
-        # Subnodes are then exported recursively.
+        # Subnodes are then exported depth first from an explicit stack rather than
+        # by recursion. Each node goes back on the stack beneath its subnodes, so
+        # its closing brace is written after them.
 
-        node_ref = self.nodeArray.get(node)
+        stack = [(node, poseBone, False)]
 
-        if node_ref:
-            node_type = node_ref["nodeType"]
-            self.indent_write(structIdentifier[node_type], 0, True)
-            self.write(node_ref["structName"])
+        while stack:
+            node, poseBone, subnodesDone = stack.pop()
+            node_ref = self.nodeArray.get(node)
 
-            if node_type == NODETYPE_GEO:
-                if node.hide_render:
-                    self.write(b" (visible = false)")
+            if not subnodesDone:
+                if node_ref:
+                    self.export_node_structure(node, node_ref, scene, poseBone)
 
-            self.indent_write(b"{\n", 0, True)
-            self.indentLevel += 1
+                stack.append((node, None, True))
+                stack.extend(
+                    (subnode, None, False)
+                    for subnode in reversed(node.children)
+                    if subnode.parent_type != "BONE"
+                )
 
-            structFlag = False
+            elif node_ref:
+                self.indentLevel -= 1
+                self.indent_write(b"}\n")
 
-            # Export the node's name if it has one.
+    def export_node_structure(self, node, node_ref, scene, poseBone):
+        # Opens the node's structure and writes everything that precedes its
+        # subnodes, including the bones of an armature.
 
-            name = node.name
-            if name != "":
-                self.indent_write(b'Name {string {"')
-                self.write(bytes(name, "UTF-8"))
-                self.write(b'"}}\n')
-                structFlag = True
+        node_type = node_ref["nodeType"]
+        self.indent_write(structIdentifier[node_type], 0, True)
+        self.write(node_ref["structName"])
 
-            # Export the object reference and material references.
+        if node_type == NODETYPE_GEO:
+            if node.hide_render:
+                self.write(b" (visible = false)")
 
-            object = node.data
+        self.indent_write(b"{\n", 0, True)
+        self.indentLevel += 1
 
-            if node_type == NODETYPE_GEO:
-                print(node_ref)
+        structFlag = False
 
-                if object not in self.geometryArray:
-                    # Attempt to sanitize name
-                    geomName = object.name.replace(" ", "_")
-                    geomName = geomName.replace(".", "_").lower()
+        # Export the node's name if it has one.
 
-                    self.geometryArray[object] = {
-                        "structName": bytes(geomName, "UTF-8"),
-                        "nodeTable": [node],
-                    }
-                else:
-                    self.geometryArray[object]["nodeTable"].append(node)
+        name = node.name
+        if name != "":
+            self.indent_write(b'Name {string {"')
+            self.write(name.encode("UTF-8"))
+            self.write(b'"}}\n')
+            structFlag = True
 
-                self.indent_write(b"ObjectRef {ref {$")
-                self.write(self.geometryArray[object]["structName"])
-                self.write(b"}}\n")
+        # Export the object reference and material references.
 
-                if self.option_export_materials:
-                    for i in range(len(node.material_slots)):
-                        self.ExportMaterialRef(node.material_slots[i].material, i)
+        object = node.data
 
-                shapeKeys = OpenGexExporter.get_shape_keys(object)
-                if shapeKeys:
-                    self.ExportMorphWeights(node, shapeKeys, scene)
+        if node_type == NODETYPE_GEO:
+            print(node_ref)
 
-                structFlag = True
+            object_ref = self.geometryArray.get(object)
+            if object_ref is None:
+                # Attempt to sanitize name
+                geomName = object.name.replace(" ", "_")
+                geomName = geomName.replace(".", "_").lower()
 
-            elif node_type == NODETYPE_LIGHT:
-                if not object in self.lightArray:
-                    self.lightArray[object] = {
-                        "structName": bytes(
-                            "light" + str(len(self.lightArray) + 1), "UTF-8"
-                        ),
-                        "nodeTable": [node],
-                    }
-                else:
-                    self.lightArray[object]["nodeTable"].append(node)
+                object_ref = self.geometryArray[object] = {
+                    "structName": geomName.encode("UTF-8"),
+                    "nodeTable": [node],
+                }
+            else:
+                object_ref["nodeTable"].append(node)
 
-                self.indent_write(b"ObjectRef {ref {$")
-                self.write(self.lightArray[object]["structName"])
-                self.write(b"}}\n")
-                structFlag = True
+            self.indent_write(b"ObjectRef {ref {$")
+            self.write(object_ref["structName"])
+            self.write(b"}}\n")
 
-            elif node_type == NODETYPE_CAMERA:
-                if not object in self.cameraArray:
-                    self.cameraArray[object] = {
-                        "structName": bytes(
-                            "camera" + str(len(self.cameraArray) + 1), "UTF-8"
-                        ),
-                        "nodeTable": [node],
-                    }
-                else:
-                    self.cameraArray[object]["nodeTable"].append(node)
+            if self.option_export_materials:
+                for i in range(len(node.material_slots)):
+                    self.ExportMaterialRef(node.material_slots[i].material, i)
 
-                self.indent_write(b"ObjectRef {ref {$")
-                self.write(self.cameraArray[object]["structName"])
-                self.write(b"}}\n")
-                structFlag = True
+            shapeKeys = node_ref["shapeKeys"]
+            if shapeKeys:
+                self.ExportMorphWeights(node, shapeKeys, scene)
 
-            if structFlag:
-                self.write(b"\n")
+            structFlag = True
 
-            if poseBone:
-                # If the node is parented to a bone and is not relative, then undo the bone's transform.
+        elif node_type == NODETYPE_LIGHT:
+            object_ref = self.lightArray.get(object)
+            if object_ref is None:
+                object_ref = self.lightArray[object] = {
+                    "structName": b"light%d" % (len(self.lightArray) + 1),
+                    "nodeTable": [node],
+                }
+            else:
+                object_ref["nodeTable"].append(node)
 
-                if math.fabs(poseBone.matrix.determinant()) > EPSILON:
-                    self.indent_write(b"Transform\n")
-                    self.indent_write(b"{\n")
-                    self.indentLevel += 1
+            self.indent_write(b"ObjectRef {ref {$")
+            self.write(object_ref["structName"])
+            self.write(b"}}\n")
+            structFlag = True
+
+        elif node_type == NODETYPE_CAMERA:
+            object_ref = self.cameraArray.get(object)
+            if object_ref is None:
+                object_ref = self.cameraArray[object] = {
+                    "structName": b"camera%d" % (len(self.cameraArray) + 1),
+                    "nodeTable": [node],
+                }
+            else:
+                object_ref["nodeTable"].append(node)
 
-                    self.indent_write(b"float[16]\n")
-                    self.indent_write(b"{\n")
-                    self.write_matrix(poseBone.matrix.inverted())
-                    self.indent_write(b"}\n")
+            self.indent_write(b"ObjectRef {ref {$")
+            self.write(object_ref["structName"])
+            self.write(b"}}\n")
+            structFlag = True
 
-                    self.indentLevel -= 1
-                    self.indent_write(b"}\n\n")
+        if structFlag:
+            self.write(b"\n")
 
-            # Export the transform. If the node is animated, then animation tracks are exported here.
+        if poseBone:
+            # If the node is parented to a bone and is not relative, then undo the bone's transform.
 
-            self.ExportNodeTransform(node, scene)
+            boneMatrix = poseBone.matrix
+            if abs(boneMatrix.determinant()) > EPSILON:
+                self.indent_write(b"Transform\n")
+                self.indent_write(b"{\n")
+                self.indentLevel += 1
 
-            if node.type == "ARMATURE":
-                skeleton = node.data
-                if skeleton:
-                    for bone in skeleton.bones:
-                        if not bone.parent:
-                            self.export_bone(node, bone, scene)
+                self.indent_write(b"float[16]\n")
+                self.indent_write(b"{\n")
+                self.write_matrix(boneMatrix.inverted())
+                self.indent_write(b"}\n")
+
+                self.indentLevel -= 1
+                self.indent_write(b"}\n\n")
 
-        for subnode in node.children:
-            if subnode.parent_type != "BONE":
-                self.export_node(subnode, scene)
+        # Export the transform. If the node is animated, then animation tracks are exported here.
 
-        if node_ref:
-            self.indentLevel -= 1
-            self.indent_write(b"}\n")
+        self.ExportNodeTransform(node, scene)
+
+        if node.type == "ARMATURE":
+            skeleton = node.data
+            if skeleton:
+                for bone in skeleton.bones:
+                    if not bone.parent:
+                        self.export_bone(node, bone, scene)
 
-    def ExportSkin(self, node, armature, exportVertexArray):
+    def ExportSkin(self, node, armature, exportMesh):
         # This function exports all skinning data, which includes the skeleton
         # and per-vertex bone influence data.
 
@@ -2185,21 +1772,13 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.indent_write(b"ref\t\t\t// ")
         self.write_int(boneCount)
         self.indent_write(b"{\n", 0, True)
-        self.indent_write(b"", 1)
 
-        for i in range(boneCount):
-            boneRef = self.find_node(boneArray[i].name)
-            if boneRef:
-                self.write(b"$")
-                self.write(boneRef[1]["structName"])
-            else:
-                self.write(b"null")
-
-            if i < boneCount - 1:
-                self.write(b", ")
-            else:
-                self.write(b"\n")
+        boneRefs = []
+        for bone in boneArray:
+            boneRef = self.find_node(bone.name)
+            boneRefs.append(b"$" + boneRef[1]["structName"] if boneRef else b"null")
 
+        self.indent_write(b", ".join(boneRefs) + b"\n", 1)
         self.indent_write(b"}\n")
 
         self.indentLevel -= 1
@@ -2215,12 +1794,24 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.write_int(boneCount)
         self.indent_write(b"{\n", 0, True)
 
-        for i in range(boneCount):
-            self.write_matrix_flat(armature.matrix_world @ boneArray[i].matrix_local)
-            if i < boneCount - 1:
-                self.write(b",\n")
-
-        self.indent_write(b"}\n", 0, True)
+        # Fetch all bone rest matrices at once and transform them in a single
+        # batched product. RNA stores matrices column-major, so transpose each
+        # one to match the row-major indexing of mathutils matrices.
+        localMatrices = np.empty(boneCount * 16, dtype=np.single)
+        boneArray.foreach_get("matrix_local", localMatrices)
+        localMatrices = localMatrices.reshape(boneCount, 4, 4).transpose(0, 2, 1)
+
+        # Round the same way as mathutils' Matrix @, which multiplies in float
+        # and sums the four products of each element in double, in order.
+        worldMatrix = np.array(armature.matrix_world, dtype=np.single)
+        products = worldMatrix[None, :, :, None] * localMatrices[:, None, :, :]
+        dots = products[:, :, 0].astype(np.double)
+        for item in range(1, 4):
+            dots += products[:, :, item]
+        bindMatrices = dots.astype(np.single)
+
+        self.write_matrix_array(bindMatrices)
+        self.indent_write(b"}\n")
 
         self.indentLevel -= 1
         self.indent_write(b"}\n")
@@ -2230,39 +1821,66 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
         # Export the per-vertex bone influence data.
 
-        groupRemap = []
+        boneIndexByName = {}
+        for i, bone in enumerate(boneArray):
+            boneIndexByName.setdefault(bone.name, i)
 
-        for group in node.vertex_groups:
-            groupName = group.name
-            for i in range(boneCount):
-                if boneArray[i].name == groupName:
-                    groupRemap.append(i)
-                    break
-            else:
-                groupRemap.append(-1)
+        groupRemap = np.array(
+            [boneIndexByName.get(group.name, -1) for group in node.vertex_groups],
+            dtype=np.intp,
+        )
 
-        boneCountArray = []
-        boneIndexArray = []
-        boneWeightArray = []
+        # Read the group influences of every mesh vertex once into flat arrays,
+        # since several export vertices can share a mesh vertex. Then drop the
+        # ones without a bone or weight and normalize the weights of each vertex
+        # with NumPy.
+
+        ownerArray = []
+        groupArray = []
+        weightArray = []
 
         meshVertexArray = node.data.vertices
-        for ev in exportVertexArray:
-            boneCount = 0
-            totalWeight = 0.0
-            for element in meshVertexArray[ev.vertexIndex].groups:
-                boneIndex = groupRemap[element.group]
-                boneWeight = element.weight
-                if (boneIndex >= 0) and (boneWeight != 0.0):
-                    boneCount += 1
-                    totalWeight += boneWeight
-                    boneIndexArray.append(boneIndex)
-                    boneWeightArray.append(boneWeight)
-            boneCountArray.append(boneCount)
-
-            if totalWeight != 0.0:
-                normalizer = 1.0 / totalWeight
-                for i in range(-boneCount, 0):
-                    boneWeightArray[i] *= normalizer
+        for vertexIndex, vertex in enumerate(meshVertexArray):
+            for element in vertex.groups:
+                ownerArray.append(vertexIndex)
+                groupArray.append(element.group)
+                weightArray.append(element.weight)
+
+        groupBones = groupRemap[np.array(groupArray, dtype=np.intp)]
+        groupWeights = np.array(weightArray, dtype=np.double)
+
+        influences = (groupBones >= 0) & (groupWeights != 0.0)
+        owners = np.array(ownerArray, dtype=np.intp)[influences]
+        influenceBones = groupBones[influences]
+        influenceWeights = groupWeights[influences]
+
+        # add.at sums the weights in order, like the running total it replaces.
+        meshVertexCount = len(meshVertexArray)
+        boneCounts = np.bincount(owners, minlength=meshVertexCount)
+        totalWeights = np.zeros(meshVertexCount, dtype=np.double)
+        np.add.at(totalWeights, owners, influenceWeights)
+        normalizers = np.divide(
+            1.0,
+            totalWeights,
+            out=np.ones_like(totalWeights),
+            where=(totalWeights != 0.0),
+        )
+        influenceWeights *= normalizers[owners]
+
+        # Expand the per mesh vertex runs of influences to the export vertices.
+        # The owners are in ascending order, so each mesh vertex's influences
+        # start where the counts of the vertices before it end.
+        vertexIndices = exportMesh.vertexIndex
+        vertexBoneCounts = boneCounts[vertexIndices]
+        firstInfluences = np.cumsum(boneCounts) - boneCounts
+        runStarts = np.cumsum(vertexBoneCounts) - vertexBoneCounts
+        influenceIndices = np.repeat(
+            firstInfluences[vertexIndices] - runStarts, vertexBoneCounts
+        ) + np.arange(vertexBoneCounts.sum())
+
+        boneCountArray = vertexBoneCounts.tolist()
+        boneIndexArray = influenceBones[influenceIndices].tolist()
+        boneWeightArray = influenceWeights[influenceIndices]
 
         # Write the bone count array. There is one entry per vertex.
 
@@ -2306,11 +1924,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.write_float_array(boneWeightArray)
         self.indent_write(b"}\n")
 
-        self.indentLevel -= 1
-        self.indent_write(b"}\n")
-
-        self.indentLevel -= 1
-        self.indent_write(b"}\n")
+        self.close_structures(2)
 
     def ExportGeometry(self, objectRef, scene):
         # This function exports a single geometry object.
@@ -2332,7 +1946,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         showOnlyShapeKey = node.show_only_shape_key
         currentMorphValue = []
 
-        shapeKeys = OpenGexExporter.get_shape_keys(mesh)
+        shapeKeys = self.nodeArray[node]["shapeKeys"]
         if shapeKeys:
             node.active_shape_key_index = 0
             node.show_only_shape_key = True
@@ -2364,7 +1978,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
                     self.write(b")\n")
                     self.indent_write(b"{\n")
                     self.indent_write(b'Name {string {"', 1)
-                    self.write(bytes(block.name, "UTF-8"))
+                    self.write(block.name.encode("UTF-8"))
                     self.write(b'"}}\n')
                     self.indent_write(b"}\n")
                     structFlag = True
@@ -2394,16 +2008,14 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         # Triangulate mesh and remap vertices to eliminate duplicates.
 
         materialTable = []
-        exportVertexArray = OpenGexExporter.deindex_mesh(
+        exportMesh = OpenGexExporter.deindex_mesh(
             exportMesh, materialTable, self.option_export_vertex_colors
         )
         triangleCount = len(materialTable)
 
         indexTable = []
-        unifiedVertexArray = OpenGexExporter.unify_vertices(
-            exportVertexArray, indexTable
-        )
-        vertexCount = len(unifiedVertexArray)
+        unifiedMesh = OpenGexExporter.unify_vertices(exportMesh, indexTable)
+        vertexCount = len(unifiedMesh)
 
         # Write the position array.
 
@@ -2414,7 +2026,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.indent_write(b"float[3]\t\t// ")
         self.write_int(vertexCount)
         self.indent_write(b"{\n", 0, True)
-        self.write_vertex_array_3d(unifiedVertexArray, "position")
+        self.write_vertex_array_3d(unifiedMesh.position)
         self.indent_write(b"}\n")
 
         self.indentLevel -= 1
@@ -2429,7 +2041,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             self.indent_write(b"float[3]\t\t// ")
             self.write_int(vertexCount)
             self.indent_write(b"{\n", 0, True)
-            self.write_vertex_array_3d(unifiedVertexArray, "normal")
+            self.write_vertex_array_3d(unifiedMesh.normal)
             self.indent_write(b"}\n")
 
             self.indentLevel -= 1
@@ -2445,7 +2057,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             self.indent_write(b"float[3]\t\t// ")
             self.write_int(vertexCount)
             self.indent_write(b"{\n", 0, True)
-            self.write_vertex_array_3d(unifiedVertexArray, "color")
+            self.write_vertex_array_3d(unifiedMesh.color)
             self.indent_write(b"}\n")
 
             self.indentLevel -= 1
@@ -2458,7 +2070,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
                     break
 
                 if uv_layer_index > 0:
-                    attribSuffix = bytes(f"[{uv_layer_index}]", "UTF-8")
+                    attribSuffix = b"[%d]" % uv_layer_index
                 else:
                     attribSuffix = b""
 
@@ -2472,7 +2084,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
                 self.write_int(vertexCount)
                 self.indent_write(b"{\n", 0, True)
                 self.write_vertex_array_2d(
-                    unifiedVertexArray, "texcoord" + str(uv_layer_index)
+                    getattr(unifiedMesh, "texcoord" + str(uv_layer_index))
                 )
                 self.indent_write(b"}\n")
 
@@ -2504,8 +2116,8 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
                 self.indent_write(b"float[3]\t\t// ")
                 self.write_int(vertexCount)
                 self.indent_write(b"{\n", 0, True)
-                self.write_morph_position_array_3d(
-                    unifiedVertexArray, morphMesh.vertices
+                self.write_vertex_array_3d(
+                    self.morph_positions(morphMesh, unifiedMesh.vertexIndex)
                 )
                 self.indent_write(b"}\n")
 
@@ -2523,8 +2135,10 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
                 self.indent_write(b"float[3]\t\t// ")
                 self.write_int(vertexCount)
                 self.indent_write(b"{\n", 0, True)
-                self.write_morph_normal_array_3d(
-                    unifiedVertexArray, morphMesh.vertices, morphMesh.loop_triangles
+                self.write_vertex_array_3d(
+                    self.morph_normals(
+                        morphMesh, unifiedMesh.vertexIndex, unifiedMesh.faceIndex
+                    )
                 )
                 self.indent_write(b"}\n")
 
@@ -2536,11 +2150,11 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
         # Write the index arrays.
 
-        maxMaterialIndex = 0
-        for i in range(len(materialTable)):
-            index = materialTable[i]
-            if index > maxMaterialIndex:
-                maxMaterialIndex = index
+        # Count the triangles of every material index in one pass. The highest
+        # index in use decides whether separate index arrays are needed.
+        materials = np.array(materialTable, dtype=np.int32)
+        materialTriangleCount = np.bincount(materials, minlength=1).tolist()
+        maxMaterialIndex = len(materialTriangleCount) - 1
 
         if maxMaterialIndex == 0:
             # There is only one material, so write a single index array.
@@ -2561,19 +2175,13 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         else:
             # If there are multiple material indexes, then write a separate index array for each one.
 
-            materialTriangleCount = [0 for i in range(maxMaterialIndex + 1)]
-            for i in range(len(materialTable)):
-                materialTriangleCount[materialTable[i]] += 1
+            # Select each material's triangles with a mask over all of them
+            # instead of scanning the material table once per material.
+            triangles = np.array(indexTable, dtype=np.uint32).reshape(-1, 3)
 
             for m in range(maxMaterialIndex + 1):
                 if materialTriangleCount[m] != 0:
-                    materialIndexTable = []
-                    for i in range(len(materialTable)):
-                        if materialTable[i] == m:
-                            k = i * 3
-                            materialIndexTable.append(indexTable[k])
-                            materialIndexTable.append(indexTable[k + 1])
-                            materialIndexTable.append(indexTable[k + 2])
+                    materialIndexTable = triangles[materials == m].ravel().tolist()
 
                     self.indent_write(b"IndexArray (material = ", 0, True)
                     self.write_int(m)
@@ -2595,7 +2203,7 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         # If the mesh is skinned, export the skinning data here.
 
         if armature:
-            self.ExportSkin(node, armature, unifiedVertexArray)
+            self.ExportSkin(node, armature, unifiedMesh)
 
         # Restore the morph state.
 
@@ -2617,32 +2225,53 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.indentLevel -= 1
         self.write(b"}\n")
 
+    def ExportParam(self, attrib, value, extra=0):
+        # Writes a Param structure holding a single float.
+        self.indent_write(
+            b'Param (attrib = "%s") {float {%s}}\n'
+            % (attrib, self.format_float(value)),
+            extra,
+        )
+
+    def ExportAttenuation(self, attributes, params, newline=True, closing=b"}\n"):
+        # Writes an Atten structure and its float params in a single write.
+        indent = self.indent()
+        paramIndent = self.indent(1)
+        lines = [b"%sAtten (%s)\n%s{\n" % (indent, attributes, indent)]
+        for attrib, value in params:
+            lines.append(
+                b'%sParam (attrib = "%s") {float {%s}}\n'
+                % (paramIndent, attrib, self.format_float(value))
+            )
+        lines.append(indent + closing)
+
+        self.write((b"\n" if newline else b"") + b"".join(lines))
+
     def ExportLight(self, objectRef):
         # This function exports a single light object.
-        self.write(b"\nLightObject $")
-        self.write(objectRef[1]["structName"])
 
         object = objectRef[0]
         type = object.type
 
-        self.write(b" (type = ")
         pointFlag = False
         spotFlag = False
 
         if type == "SUN":
-            self.write(b'"infinite"')
+            lightType = b'"infinite"'
         elif type == "POINT":
-            self.write(b'"point"')
+            lightType = b'"point"'
             pointFlag = True
         else:
-            self.write(b'"spot"')
+            lightType = b'"spot"'
             pointFlag = True
             spotFlag = True
 
-        if not object.use_shadow:
-            self.write(b", shadow = false")
+        shadow = b"" if object.use_shadow else b", shadow = false"
 
-        self.write(b")")
+        self.write(
+            b"\nLightObject $%s (type = %s%s)"
+            % (objectRef[1]["structName"], lightType, shadow)
+        )
         self.write_node_table(objectRef)
 
         self.write(b"\n{\n")
@@ -2650,15 +2279,15 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
         # Export the light's color, and include a separate intensity if necessary.
 
-        self.indent_write(b'Color (attrib = "light") {float[3] {')
-        self.write_color(object.color)
-        self.write(b"}}\n")
+        color = object.color
+        self.indent_write(
+            b'Color (attrib = "light") {float[3] {%s}}\n'
+            % self.format_vector((color[0], color[1], color[2]))
+        )
 
         intensity = object.energy
         if intensity != 1.0:
-            self.indent_write(b'Param (attrib = "intensity") {float {')
-            self.write_float(intensity)
-            self.write(b"}}\n")
+            self.ExportParam(b"intensity", intensity)
 
         if pointFlag:
             # Export a separate attenuation function for each type that's in use.
@@ -2666,92 +2295,54 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             falloff = object.falloff_type
 
             if falloff == "INVERSE_LINEAR":
-                self.indent_write(b'Atten (curve = "inverse")\n', 0, True)
-                self.indent_write(b"{\n")
-
-                self.indent_write(b'Param (attrib = "scale") {float {', 1)
-                self.write_float(object.distance)
-                self.write(b"}}\n")
-
-                self.indent_write(b"}\n")
+                self.ExportAttenuation(
+                    b'curve = "inverse"', ((b"scale", object.distance),)
+                )
 
             elif falloff == "INVERSE_SQUARE":
-                self.indent_write(b'Atten (curve = "inverse_square")\n', 0, True)
-                self.indent_write(b"{\n")
-
-                self.indent_write(b'Param (attrib = "scale") {float {', 1)
-                self.write_float(math.sqrt(object.distance))
-                self.write(b"}}\n")
-
-                self.indent_write(b"}\n")
+                self.ExportAttenuation(
+                    b'curve = "inverse_square"',
+                    ((b"scale", math.sqrt(object.distance)),),
+                )
 
             elif falloff == "LINEAR_QUADRATIC_WEIGHTED":
                 if object.linear_attenuation != 0.0:
-                    self.indent_write(b'Atten (curve = "inverse")\n', 0, True)
-                    self.indent_write(b"{\n")
-
-                    self.indent_write(b'Param (attrib = "scale") {float {', 1)
-                    self.write_float(object.distance)
-                    self.write(b"}}\n")
-
-                    self.indent_write(b'Param (attrib = "constant") {float {', 1)
-                    self.write_float(1.0)
-                    self.write(b"}}\n")
-
-                    self.indent_write(b'Param (attrib = "linear") {float {', 1)
-                    self.write_float(object.linear_attenuation)
-                    self.write(b"}}\n")
-
-                    self.indent_write(b"}\n\n")
+                    self.ExportAttenuation(
+                        b'curve = "inverse"',
+                        (
+                            (b"scale", object.distance),
+                            (b"constant", 1.0),
+                            (b"linear", object.linear_attenuation),
+                        ),
+                        closing=b"}\n\n",
+                    )
 
                 if object.quadratic_attenuation != 0.0:
-                    self.indent_write(b'Atten (curve = "inverse_square")\n')
-                    self.indent_write(b"{\n")
-
-                    self.indent_write(b'Param (attrib = "scale") {float {', 1)
-                    self.write_float(object.distance)
-                    self.write(b"}}\n")
-
-                    self.indent_write(b'Param (attrib = "constant") {float {', 1)
-                    self.write_float(1.0)
-                    self.write(b"}}\n")
-
-                    self.indent_write(b'Param (attrib = "quadratic") {float {', 1)
-                    self.write_float(object.quadratic_attenuation)
-                    self.write(b"}}\n")
-
-                    self.indent_write(b"}\n")
+                    self.ExportAttenuation(
+                        b'curve = "inverse_square"',
+                        (
+                            (b"scale", object.distance),
+                            (b"constant", 1.0),
+                            (b"quadratic", object.quadratic_attenuation),
+                        ),
+                        newline=False,
+                    )
 
             if VERSION[0] < 3 and (object.use_sphere):
-                self.indent_write(b'Atten (curve = "linear")\n', 0, True)
-                self.indent_write(b"{\n")
-
-                self.indent_write(b'Param (attrib = "end") {float {', 1)
-                self.write_float(object.distance)
-                self.write(b"}}\n")
-
-                self.indent_write(b"}\n")
+                self.ExportAttenuation(
+                    b'curve = "linear"', ((b"end", object.distance),)
+                )
 
             if spotFlag:
                 # Export additional angular attenuation for spot lights.
 
-                self.indent_write(
-                    b'Atten (kind = "angle", curve = "linear")\n', 0, True
-                )
-                self.indent_write(b"{\n")
-
                 endAngle = object.spot_size * 0.5
                 beginAngle = endAngle * (1.0 - object.spot_blend)
 
-                self.indent_write(b'Param (attrib = "begin") {float {', 1)
-                self.write_float(beginAngle)
-                self.write(b"}}\n")
-
-                self.indent_write(b'Param (attrib = "end") {float {', 1)
-                self.write_float(endAngle)
-                self.write(b"}}\n")
-
-                self.indent_write(b"}\n")
+                self.ExportAttenuation(
+                    b'kind = "angle", curve = "linear"',
+                    ((b"begin", beginAngle), (b"end", endAngle)),
+                )
 
         self.indentLevel -= 1
         self.write(b"}\n")
@@ -2768,17 +2359,20 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
         object = objectRef[0]
 
-        self.indent_write(b'Param (attrib = "fov") {float {')
-        self.write_float(object.angle_x)
-        self.write(b"}}\n")
-
-        self.indent_write(b'Param (attrib = "near") {float {')
-        self.write_float(object.clip_start)
-        self.write(b"}}\n")
-
-        self.indent_write(b'Param (attrib = "far") {float {')
-        self.write_float(object.clip_end)
-        self.write(b"}}\n")
+        indent = self.indent()
+        self.write(
+            b'%sParam (attrib = "fov") {float {%s}}\n'
+            b'%sParam (attrib = "near") {float {%s}}\n'
+            b'%sParam (attrib = "far") {float {%s}}\n'
+            % (
+                indent,
+                self.format_float(object.angle_x),
+                indent,
+                self.format_float(object.clip_start),
+                indent,
+                self.format_float(object.clip_end),
+            )
+        )
 
         self.indentLevel -= 1
         self.write(b"}\n")
@@ -2791,8 +2385,8 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         for objectRef in self.cameraArray.items():
             self.ExportCamera(objectRef)
 
-    def FindTextureInNodeTree(self, bsdf, channel):
-        curr = bsdf.inputs[channel]
+    def FindTextureInNodeTree(self, socket):
+        curr = socket
 
         while curr and curr.is_linked:
             node = curr.links[0].from_socket.node
@@ -2830,39 +2424,42 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
     def ExportImageNodeTexture(self, image, attrib):
         # This function exports a single texture from a material.
 
-        self.indent_write(b'Texture (attrib = "', 0, False)
-        self.write(attrib)
-        self.write(b'")\n')
-
+        self.indent_write(b'Texture (attrib = "%s")\n' % attrib)
         self.indent_write(b"{\n")
-        self.indentLevel += 1
-
-        self.indent_write(b'string {"')
 
         # ***
 
+        # The texture directory comes from the add-on preferences. It is resolved
+        # for the first texture and reused for the rest of the export, with an
+        # empty string standing for a directory that doesn't exist.
+        if self.textureDirectory is None:
+            preferences = bpy.context.preferences.addons[__name__].preferences
+            texture_dir = os.path.abspath(
+                bpy.path.abspath(preferences.texture_directory)
+            )
+            self.textureDirectory = texture_dir if os.path.isdir(texture_dir) else ""
+
         prefix = ""
 
         # Copy the image to the texture directory.
-        texture_dir = os.path.abspath(
-            bpy.path.abspath(
-                bpy.context.preferences.addons[__name__].preferences.texture_directory
-            )
-        )
-
-        if os.path.isdir(texture_dir):
-            filename = os.path.basename(image.filepath)
-            dst = os.path.join(texture_dir, filename)
-            image.save(filepath=dst)
+        texture_dir = self.textureDirectory
+
+        if texture_dir:
+            # Materials often share images, so each one is only saved the first
+            # time it is referenced.
+            if image not in self.savedImageSet:
+                filename = os.path.basename(image.filepath)
+                dst = os.path.join(texture_dir, filename)
+                image.save(filepath=dst)
+                self.savedImageSet.add(image)
             prefix = f"/{os.path.basename(texture_dir)}/"
-        self.write_file_name(prefix + os.path.basename(image.filepath))
+        filename = self.format_file_name(prefix + os.path.basename(image.filepath))
         # ***
 
-        self.write(b'"}\n')
+        self.indent_write(b'string {"%s"}\n' % filename, 1)
 
         # TODO: look for a vector transform node and convert the scale/offsets
 
-        self.indentLevel -= 1
         self.indent_write(b"}\n")
 
     def ExportMaterialParam(
@@ -2889,10 +2486,9 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
             ):
                 didWriteValue = True
                 self.indent_write(
-                    b'Color (attrib = "' + ogexParamName + b'") {float[3] {'
+                    b'Color (attrib = "%s") {float[3] {%s}}\n'
+                    % (ogexParamName, self.format_vector(color[:3]))
                 )
-                self.write_color(color)
-                self.write(b"}}\n")
 
         elif MaterialPropertyFlags.PropertyParam in propertyFlags:
             if type(channel) == bpy.types.NodeSocketColor:
@@ -2902,12 +2498,10 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
 
             if value != defaultValue:
                 didWriteValue = True
-                self.indent_write(b'Param (attrib = "' + ogexParamName + b'") {float {')
-                self.write_float(value)
-                self.write(b"}}\n")
+                self.ExportParam(ogexParamName, value)
 
         if MaterialPropertyFlags.PropertyTexture in propertyFlags:
-            textureNode = self.FindTextureInNodeTree(bsdf, blenderParamName)
+            textureNode = self.FindTextureInNodeTree(channel)
             if textureNode:
                 self.ExportImageNodeTexture(textureNode, ogexParamName)
                 didWriteValue = True
@@ -2929,15 +2523,12 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         for materialRef in self.materialArray.items():
             material = materialRef[0]
 
-            self.write(b"\nMaterial $")
-            self.write(materialRef[1]["structName"])
-            self.write(b"\n{\n")
+            self.write(b"\nMaterial $%s\n{\n" % materialRef[1]["structName"])
             self.indentLevel += 1
 
             if material.name != "":
-                self.indent_write(b'Name {string {"')
-                self.write(bytes(material.name, "UTF-8"))
-                self.write(b'"}}\n\n')
+                name = material.name.encode("UTF-8")
+                self.indent_write(b'Name {string {"%s"}}\n\n' % name)
 
             bsdf = None
             if material.node_tree:
@@ -3006,21 +2597,33 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.write(b'Metric (key = "up") {string {"z"}}\n')
 
     @staticmethod
-    def select_and_make_active(ob: bpy.types.Object):
-        for ob_to_deselect in bpy.data.objects:
-            if ob_to_deselect == ob:
-                continue
-            ob_to_deselect.select_set(False)
-
+    def make_active(ob: bpy.types.Object):
+        # Unlike MatrixApplicator.select_and_make_active this leaves the rest of
+        # the selection alone, so the caller decides what else is selected.
         assert bpy.context
         bpy.context.view_layer.objects.active = ob
         ob.select_set(True)
 
         print(f"[ Status ] {ob.name} set to Active Object")
 
-    def execute(self, context):
-        self.file = WriteBuffer()
+    def export_scene(self, scene):
+        self.ExportMetrics(scene)
+
+        for object in scene.objects:
+            if not object.parent:
+                self.process_node(object)
+
+        self.index_nodes_by_name()
+        self.process_skinned_meshes()
+
+        for object in scene.objects:
+            if not object.parent:
+                self.export_node(object, scene)
+
+        self.ExportObjects(scene)
+        self.ExportMaterials()
 
+    def execute(self, context):
         self.indentLevel = 0
 
         self.nodeArray = {}
@@ -3029,6 +2632,13 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.cameraArray = {}
         self.materialArray = {}
         self.boneParentArray = {}
+        self.boneCurveArray = {}
+        self.actionHeaderArray = {}
+        self.boneInverseArray = {}
+        self.poseInverseArray = {}
+        self.sampledKeyTimes = None
+        self.savedImageSet = set()
+        self.textureDirectory = None
 
         print("\nOpenGex export starting... %r" % self.filepath)  # type: ignore
         start_time = time.perf_counter()
@@ -3037,7 +2647,6 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.ctx = context
 
         scene = self.ctx.scene
-        self.ExportMetrics(scene)
 
         originalFrame = scene.frame_current
         originalSubframe = scene.frame_subframe
@@ -3051,33 +2660,43 @@ class OpenGexExporter(bpy.types.Operator, ExportHelper):
         self.sampleAnimationFlag = self.option_sample_animation
 
         if self.option_apply_transforms:
+            targets = []
             for ob in scene.objects:
                 if ob.type == "ARMATURE":
                     t = MatrixApplicator(ob)
                     t.execute()
                 else:
-                    self.select_and_make_active(ob)
-
-                    # apply transforms
-                    bpy.ops.object.transform_apply(location=True, scale=True, rotation=True)
-
-        for object in scene.objects:
-            if not object.parent:
-                self.process_node(object)
-
-        self.process_skinned_meshes()
-
-        for object in scene.objects:
-            if not object.parent:
-                self.export_node(object, scene)
-
-        self.ExportObjects(scene)
-        self.ExportMaterials()
-
-        if self.restoreFrame:
-            scene.frame_set(originalFrame, originalSubframe)
-
-        self.file.write_to_file(self.filepath)  # type: ignore
+                    targets.append(ob)
+
+            bpy.ops.object.select_all(action="DESELECT")
+
+            if targets:
+                for ob in targets:
+                    ob.select_set(True)
+                self.make_active(targets[0])
+
+                # apply transforms to every selected object in one operator call
+                bpy.ops.object.transform_apply(location=True, scale=True, rotation=True)
+
+        # Stream straight to disk. A large file buffer batches the small writes,
+        # so the export never has to be held in memory as a whole. The output
+        # goes to a temporary file next to the target and only replaces it once
+        # complete, so a failed export leaves any previous file untouched.
+        tempPath = self.filepath + ".tmp"  # type: ignore
+        file = open(tempPath, "wb", buffering=1 << 20)
+        try:
+            with file:
+                self.begin_output(file)
+                self.export_scene(scene)
+            os.replace(tempPath, self.filepath)  # type: ignore
+        finally:
+            # The temporary file is already gone after a successful replace, and
+            # a failing cleanup must not hide the error that stopped the export.
+            with contextlib.suppress(OSError):
+                os.remove(tempPath)
+
+            if self.restoreFrame:
+                scene.frame_set(originalFrame, originalSubframe)
 
         print("Export finished in %.4f sec." % (time.perf_counter() - start_time))
         return {"FINISHED"}